@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        import api.v1.signals  # noqa: F401
+        from api.v1.metrics import add_query_counter
+        connection_created.connect(add_query_counter)
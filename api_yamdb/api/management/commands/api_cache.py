@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'show hit/miss counters of the api response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='reset counters after printing them'
+        )
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, "
+            f'hit ratio: {ratio:.2%}'
+        )
+        if options['reset']:
+            reset_cache_stats()
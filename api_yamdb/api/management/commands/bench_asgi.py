@@ -0,0 +1,113 @@
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.management.commands.bench_title_search import percentile
+
+SERVERS = {
+    'wsgi': ('api_yamdb.wsgi:application',),
+    'asgi': ('api_yamdb.asgi:application',
+             '--worker-class', 'uvicorn.workers.UvicornWorker'),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+class Command(BaseCommand):
+    help = (
+        'compare sync gunicorn workers with uvicorn workers on the read '
+        'endpoints at the same worker count'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument(
+            '--concurrency', default='1,8,32',
+            help='comma separated numbers of parallel clients'
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='endpoint to request, may be repeated'
+        )
+        parser.add_argument(
+            '--wsgi-url', help='use an already running WSGI server'
+        )
+        parser.add_argument(
+            '--asgi-url', help='use an already running ASGI server'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/v1/titles/']
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        self.stdout.write(
+            f'{options["workers"]} workers, {options["requests"]} requests '
+            f'per level, {", ".join(paths)}'
+        )
+        for mode in SERVERS:
+            url = options[f'{mode}_url']
+            server = None if url else self.start(mode, options['workers'])
+            try:
+                base = url or f'http://127.0.0.1:{server.port}'
+                self.wait(base + paths[0])
+                for level in levels:
+                    self.run(mode, base, paths, level, options['requests'])
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait()
+
+    def start(self, mode, workers):
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+             '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+             '--log-level', 'warning'],
+            cwd=settings.BASE_DIR
+        )
+        server.port = port
+        return server
+
+    def wait(self, url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if fetch(url)[1]:
+                return
+            time.sleep(0.2)
+        raise CommandError(f'{url} did not answer in {timeout}s')
+
+    def run(self, mode, base, paths, level, total):
+        urls = [base + paths[i % len(paths)] for i in range(total)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(level) as pool:
+            results = list(pool.map(fetch, urls))
+        elapsed = time.perf_counter() - start
+        timings = [timing for timing, _ in results]
+        errors = sum(not ok for _, ok in results)
+        self.stdout.write(
+            f'{mode} c={level:<4} {total / elapsed:8.1f} req/s   '
+            f'p50 {percentile(timings, 0.5):8.2f} ms   '
+            f'p95 {percentile(timings, 0.95):8.2f} ms   errors {errors}'
+        )
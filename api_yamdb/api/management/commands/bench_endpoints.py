@@ -0,0 +1,217 @@
+import json
+import random
+import subprocess
+import time
+import uuid
+
+from django.apps import apps
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.generation import confirm_target
+from reviews.models import Comment, Genre, Review, Title
+from user.models import User
+
+from api.management.commands.bench_title_search import percentile
+from api.v1.cache import bump_version
+
+API = '/api/v1'
+
+
+def sample(model, count):
+    """Случайные строки по случайным id, без ORDER BY RANDOM()."""
+    last = model.objects.aggregate(last=Max('pk'))['last']
+    if last is None:
+        raise CommandError(
+            f'no {model._meta.verbose_name_plural}, '
+            'run generate_catalogue first'
+        )
+    rows = []
+    while len(rows) < count:
+        row = model.objects.filter(
+            pk__gte=random.randint(1, last)
+        ).order_by('pk').first()
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def filtered_titles():
+    title = sample(Title, 1)[0]
+    genre = title.genre.first() or sample(Genre, 1)[0]
+    return (
+        f'{API}/titles/?genre={genre.slug}&year_min={title.year - 20}'
+        f'&year_max={title.year + 20}&ordering=-rating'
+    )
+
+
+def build_cases(repeat, prefix):
+    """Запросы каждого эндпоинта: метод, адрес и данные на итерацию."""
+    comments = sample(Comment, repeat)
+    reviews = [comment.review for comment in comments]
+    return {
+        'titles-list': [('get', f'{API}/titles/', None)] * repeat,
+        'titles-list-filtered': [
+            ('get', filtered_titles(), None) for _ in range(repeat)
+        ],
+        'titles-detail': [
+            ('get', f'{API}/titles/{review.title_id}/', None)
+            for review in reviews
+        ],
+        'reviews-list': [
+            ('get', f'{API}/titles/{review.title_id}/reviews/', None)
+            for review in reviews
+        ],
+        'comments-list': [
+            ('get', f'{API}/titles/{review.title_id}/reviews/{review.pk}/'
+                    f'comments/', None)
+            for review in reviews
+        ],
+        'signup': [
+            ('post', f'{API}/auth/signup/', signup_data(prefix))
+            for _ in range(repeat)
+        ],
+        'token': [
+            ('post', f'{API}/auth/token/', token_data(prefix))
+            for _ in range(repeat)
+        ],
+    }
+
+
+def signup_data(prefix):
+    name = f'{prefix}{uuid.uuid4().hex[:12]}'
+    return {'username': name, 'email': f'{name}@example.com'}
+
+
+def token_data(prefix):
+    user = User.objects.create(**signup_data(prefix))
+    return {
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    }
+
+
+def cache_labels():
+    return [
+        model._meta.model_name
+        for model in apps.get_app_config('reviews').get_models()
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), capture_output=True,
+            text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'time the hot API endpoints through the test client and report '
+        'p50/p95 and queries per request as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='keep the response cache; by default it is invalidated '
+                 'before every request to time the database path'
+        )
+        parser.add_argument('--output', help='write the JSON report here')
+        parser.add_argument(
+            '--compare', help='JSON report of another run to compare with'
+        )
+        parser.add_argument(
+            '--yes', action='store_true',
+            help='confirm writing to the configured database: signup and '
+                 'token users and, without --warm-cache, cache versions'
+        )
+
+    def handle(self, *args, **options):
+        confirm_target(options['yes'])
+        random.seed(options['seed'])
+        self.options = options
+        client = Client()
+        # пользователи из signup и token удаляются после замеров
+        prefix = f'bench_{uuid.uuid4().hex[:6]}_'
+        try:
+            cases = build_cases(options['warmup'] + options['repeat'], prefix)
+            results = {
+                label: self.measure(client, requests)
+                for label, requests in cases.items()
+            }
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+        report = {
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'rows': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Title, Review, Comment)
+            },
+            'repeat': options['repeat'],
+            'warm_cache': options['warm_cache'],
+            'endpoints': results,
+        }
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                self.compare(json.load(file), report)
+
+    def measure(self, client, requests):
+        timings, queries, statuses = [], [], set()
+        labels = cache_labels()
+        for number, (method, path, data) in enumerate(requests):
+            if not self.options['warm_cache']:
+                for label in labels:
+                    bump_version(label)
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = getattr(client, method)(path, data)
+                elapsed = (time.perf_counter() - start) * 1000
+            if number < self.options['warmup']:
+                continue
+            timings.append(elapsed)
+            queries.append(len(context.captured_queries))
+            statuses.add(response.status_code)
+        return {
+            'path': requests[0][1],
+            'statuses': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': max(queries),
+        }
+
+    def compare(self, before, after):
+        self.stderr.write(
+            f'{"endpoint":<22}{"p50 ms":>18}{"p95 ms":>18}{"queries":>10}'
+        )
+        for label, new in after['endpoints'].items():
+            old = before['endpoints'].get(label)
+            if old is None:
+                continue
+            self.stderr.write(
+                f'{label:<22}'
+                f'{change(old["p50_ms"], new["p50_ms"]):>18}'
+                f'{change(old["p95_ms"], new["p95_ms"]):>18}'
+                f'{old["queries"]:>5} ->{new["queries"]:>3}'
+            )
+
+
+def change(old, new):
+    percent = (new - old) / old * 100 if old else 0.0
+    return f'{new:.2f} ({percent:+.0f}%)'
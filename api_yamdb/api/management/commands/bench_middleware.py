@@ -0,0 +1,66 @@
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.utils.module_loading import import_string
+
+from api.management.commands.bench_title_search import percentile
+from api.middleware import ApiExemptMixin
+
+
+def full_stack(middleware):
+    """Тот же список, но с исходными middleware Django вместо ApiExempt*."""
+    stack = []
+    for path in middleware:
+        cls = import_string(path)
+        if issubclass(cls, ApiExemptMixin):
+            base = cls.__bases__[-1]
+            path = f'{base.__module__}.{base.__name__}'
+        stack.append(path)
+    return stack
+
+
+# браузер, побывавший в админке, присылает эти куки и в API
+COOKIES = 'sessionid=0123456789abcdef0123456789abcdef; csrftoken=' + 'x' * 32
+
+
+class Command(BaseCommand):
+    help = 'compare the request cost of the full and the API middleware stack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--path', default='/api/v1/',
+            help='endpoint to request; the API root does not query the db'
+        )
+
+    def handle(self, *args, **options):
+        stacks = {
+            'full': full_stack(settings.MIDDLEWARE),
+            'api': settings.MIDDLEWARE,
+        }
+        factory = RequestFactory()
+        results = {}
+        for label, middleware in stacks.items():
+            with override_settings(MIDDLEWARE=middleware):
+                handler = BaseHandler()
+                handler.load_middleware()
+                timings = []
+                for _ in range(options['requests']):
+                    request = factory.get(
+                        options['path'], HTTP_COOKIE=COOKIES
+                    )
+                    start = time.perf_counter()
+                    handler.get_response(request)
+                    timings.append((time.perf_counter() - start) * 1e6)
+            results[label] = percentile(timings, 0.5)
+            self.stdout.write(
+                f'{label:<5} p50 {results[label]:8.1f} us   '
+                f'p95 {percentile(timings, 0.95):8.1f} us'
+            )
+        self.stdout.write(
+            f'saved per request (p50): {results["full"] - results["api"]:.1f}'
+            f' us'
+        )
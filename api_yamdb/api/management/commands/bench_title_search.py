@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from reviews.generation import WORDS, confirm_target
+from reviews.models import Title
+
+from api.v1.filters import TitleFilter
+
+
+def make_typo(word):
+    position = random.randrange(len(word))
+    return word[:position] + word[position + 1:] + word[position]
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        'generate titles and compare search against the exact name filter; '
+        'writes to the configured database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--yes', action='store_true',
+            help='confirm writing to the configured database'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.fill(options['titles'], options['batch_size'], options['yes'])
+        names = list(
+            Title.objects.order_by('?').values_list('name', flat=True)[
+                :options['repeat']
+            ]
+        )
+        cases = {
+            'name filter, exact name': lambda name: TitleFilter(
+                {'name': name}, queryset=Title.objects.all()
+            ).qs,
+            'search, one word': lambda name: Title.objects.search(
+                name.split()[0]
+            ),
+            'search, full name': lambda name: Title.objects.search(name),
+            'search, typo': lambda name: Title.objects.search(
+                make_typo(name.split()[0])
+            ),
+        }
+        self.stdout.write(
+            f'{connection.vendor}, {Title.objects.count()} titles, '
+            f'{len(names)} queries per case'
+        )
+        for label, build in cases.items():
+            timings = []
+            for name in names:
+                start = time.perf_counter()
+                list(build(name)[:5])
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'{label:<26} p50 {percentile(timings, 0.5):8.2f} ms   '
+                f'p95 {percentile(timings, 0.95):8.2f} ms'
+            )
+
+    def fill(self, target, batch_size, confirmed):
+        missing = target - Title.objects.count()
+        if missing > 0:
+            confirm_target(confirmed)
+        while missing > 0:
+            size = min(batch_size, missing)
+            Title.objects.bulk_create(
+                Title(
+                    name=' '.join(random.sample(WORDS, 3)),
+                    year=random.randint(1900, 2023),
+                    description=' '.join(random.choices(WORDS, k=12)),
+                )
+                for _ in range(size)
+            )
+            missing -= size
+            self.stdout.write(f'generated, {missing} titles left')
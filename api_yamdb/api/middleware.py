@@ -0,0 +1,82 @@
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6, Django 3.2
+    from asyncio import coroutines, iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = coroutines._is_coroutine
+        return func
+
+API_PREFIX = '/api/'
+
+
+def is_api(request):
+    return request.path_info.startswith(API_PREFIX)
+
+
+class AsyncCapableMiddleware:
+    """Основа middleware, которое работает в обоих режимах.
+
+    Под ASGI Django не переводит такое middleware в поток, и запрос
+    доходит до асинхронного представления без лишних переходов между
+    потоками. Подкласс обрабатывает запрос в __call__ и, если
+    self.is_async, в __acall__.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class ApiExemptMixin:
+    """Пропускает запросы к API мимо middleware.
+
+    API аутентифицируется по JWT и не пользуется сессиями, CSRF,
+    сообщениями и запретом фреймов; админка и redoc получают полный
+    набор.
+    """
+
+    def __call__(self, request):
+        if is_api(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class ApiExemptSessionMiddleware(ApiExemptMixin, SessionMiddleware):
+    pass
+
+
+class ApiExemptCsrfViewMiddleware(ApiExemptMixin, CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args,
+                     callback_kwargs):
+        if is_api(request):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class ApiExemptAuthenticationMiddleware(ApiExemptMixin,
+                                        AuthenticationMiddleware):
+    pass
+
+
+class ApiExemptMessageMiddleware(ApiExemptMixin, MessageMiddleware):
+    pass
+
+
+class ApiExemptXFrameOptionsMiddleware(ApiExemptMixin,
+                                       XFrameOptionsMiddleware):
+    pass
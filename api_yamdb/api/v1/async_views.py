@@ -0,0 +1,60 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+# горячие эндпоинты чтения, которые в режиме ASGI не занимают общий поток
+ASYNC_ROUTES = ('titles-list', 'titles-detail', 'reviews-list',
+                'comments-list')
+
+
+def in_db_thread(func):
+    """Запускает синхронный код с ORM в потоке из пула.
+
+    В Django 3.2 нет асинхронного ORM, а sync_to_async по умолчанию
+    (thread_sensitive) выполняет весь синхронный код процесса в одном
+    потоке. Здесь каждый вызов идёт в отдельный поток со своим
+    соединением; устаревшие соединения закрываются, как в конце
+    обычного запроса.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def async_view(view):
+    """Асинхронная версия DRF-представления.
+
+    Аутентификация, права, фильтры, пагинация и сериализация остаются
+    теми же, поэтому ответы совпадают с синхронными. В отдельный поток
+    уходят только безопасные методы; записи выполняются в общем потоке
+    синхронного кода, как у обычного синхронного представления.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        in_thread = (
+            in_db_thread if request.method in SAFE_METHODS else sync_to_async
+        )
+        response = await in_thread(view)(request, *args, **kwargs)
+        # DRF отдаёт TemplateResponse, рендерим в том же потоке
+        if hasattr(response, 'render') and not response.is_rendered:
+            await in_thread(response.render)()
+        return response
+
+    return wrapper
+
+
+def async_urls(urls, names=ASYNC_ROUTES):
+    return [
+        URLPattern(url.pattern, async_view(url.callback), url.default_args,
+                   url.name)
+        if isinstance(url, URLPattern) and url.name in names else url
+        for url in urls
+    ]
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from user.models import User
+
+CHANGED_KEY = 'api:auth:changed:{}'
+# поля пользователя, которые кладутся в токен и нужны правам доступа
+TOKEN_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+def access_token_for(user):
+    """AccessToken с ролью пользователя, чтобы не читать её из базы."""
+    token = AccessToken.for_user(user)
+    if 'iat' not in token:
+        token['iat'] = int(time.time())
+    for claim in TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class UserCache:
+    """Ограниченный LRU-кэш пользователей процесса с временем жизни."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+
+    def get(self, user_id, changed_at=0):
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is None:
+                return None
+            user, stored_at = entry
+            if stored_at <= changed_at or time.time() - stored_at > self.ttl:
+                del self.users[user_id]
+                return None
+            self.users.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.users[user_id] = (user, time.time())
+            self.users.move_to_end(user_id)
+            while len(self.users) > self.size:
+                self.users.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+user_cache = UserCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+
+
+def forget_user(user_id):
+    """Сбрасывает кэш пользователя во всех процессах.
+
+    Локальная копия удаляется сразу, а отметка времени в общем кэше
+    делает устаревшими копии в других воркерах и роли в уже выданных
+    токенах.
+    """
+    user_cache.delete(user_id)
+    cache.set(CHANGED_KEY.format(user_id), time.time(), timeout=changed_ttl())
+
+
+def changed_ttl():
+    return int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication без запроса к базе на каждый запрос.
+
+    Пользователь берётся из кэша процесса, а если его там нет, то
+    собирается из ролей в токене. В базу идём за старыми токенами без
+    ролей, после изменения пользователя, случившегося позже выдачи
+    токена, и когда отметки об изменении в общем кэше нет: её могли
+    вытеснить, и тогда роли в токене и копии в процессах не проверить.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise AuthenticationFailed(
+                _('Token contained no recognizable user identification'),
+                code='token_not_valid'
+            )
+        key = CHANGED_KEY.format(user_id)
+        changed_at = cache.get(key)
+        if changed_at is None:
+            # всё прочитанное до новой отметки считается устаревшим; add
+            # не затирает отметку forget_user, записанную за это время
+            seeded = cache.add(key, time.time(), timeout=changed_ttl())
+            user = super().get_user(validated_token)
+            if seeded:
+                user_cache.set(user_id, user)
+            return user
+        user = user_cache.get(user_id, changed_at)
+        if user is not None:
+            return user
+        if (all(claim in validated_token for claim in TOKEN_CLAIMS)
+                and validated_token.get('iat', 0) > changed_at):
+            user = User(
+                id=user_id,
+                is_active=True,
+                **{claim: validated_token[claim] for claim in TOKEN_CLAIMS}
+            )
+        else:
+            user = super().get_user(validated_token)
+        user_cache.set(user_id, user)
+        return user
@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+from api.v1.replica import reads_replica
+
+VERSION_KEY = 'api:version:{}'
+CHANGED_KEY = 'api:changed:{}'
+HITS_KEY = 'api:cache:hits'
+MISSES_KEY = 'api:cache:misses'
+
+
+def get_versions(labels):
+    """Текущие версии моделей; недостающие заводятся заново.
+
+    Начальная версия берётся от времени, чтобы после вытеснения счётчика
+    из кэша не переиспользовать старые ключи ответов.
+    """
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_modified(labels):
+    """Время последнего изменения любой из моделей, unix timestamp."""
+    keys = [CHANGED_KEY.format(label) for label in labels]
+    changed = cache.get_many(keys)
+    for key in keys:
+        if key not in changed:
+            cache.add(key, int(time.time()), timeout=None)
+            changed[key] = cache.get(key)
+    return max(changed.values(), default=0)
+
+
+def bump_version(label):
+    key = VERSION_KEY.format(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(CHANGED_KEY.format(label), int(time.time()), timeout=None)
+
+
+def replica_may_lag(labels):
+    """Запрос читает с реплики, а модели labels менялись недавно.
+
+    Такой ответ нельзя кэшировать и помечать ETag под новой версией:
+    реплика могла ещё не получить изменение, и устаревшие данные жили бы
+    под новой версией до следующего изменения модели.
+    """
+    return reads_replica() and (
+        time.time() - get_last_modified(labels)
+        <= settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def cache_stats():
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many((HITS_KEY, MISSES_KEY))
+
+
+class CachedListMixin:
+    """Кэширует ответ списка до изменения любой из моделей cache_models.
+
+    Ответ, прочитанный с реплики вскоре после изменения, не кэшируется.
+    """
+
+    cache_models = ()
+
+    def get_list_cache_key(self, request):
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        versions = get_versions(self.cache_models)
+        raw = '|'.join(
+            [request.path, params] + [str(version) for version in versions]
+        )
+        return 'api:list:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            count(HITS_KEY)
+            return Response(data)
+        count(MISSES_KEY)
+        response = super().list(request, *args, **kwargs)
+        if (response.status_code == 200
+                and not replica_may_lag(self.cache_models)):
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,74 @@
+import threading
+
+from django.db import router
+
+from api.v1.cache import get_versions
+
+# справочник больше этого не держим в памяти, ищем по slug__in
+MAX_SIZE = 1000
+
+
+class SlugCatalog:
+    """Все жанры или категории в памяти процесса, по slug.
+
+    Справочники маленькие и меняются редко. Версия модели в общем кэше,
+    которую сигналы поднимают при любом сохранении и удалении, сбрасывает
+    копии во всех воркерах; перечитывается справочник с основной базы,
+    чтобы не закэшировать отстающую реплику под новой версией.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.label = model._meta.model_name
+        self.lock = threading.Lock()
+        self.version = None
+        self.objects = None
+
+    def load(self, version):
+        using = router.db_for_write(self.model)
+        rows = list(self.model.objects.using(using)[:MAX_SIZE + 1])
+        objects = (
+            {obj.slug: obj for obj in rows} if len(rows) <= MAX_SIZE else {}
+        )
+        with self.lock:
+            self.version, self.objects = version, objects
+        return objects
+
+    def get_many(self, slugs):
+        """Объекты по slug; отсутствующих в словаре нет."""
+        version = get_versions([self.label])[0]
+        with self.lock:
+            objects = self.objects if version == self.version else None
+        if objects is None:
+            objects = self.load(version)
+        found = {slug: objects[slug] for slug in slugs if slug in objects}
+        missing = set(slugs) - set(found)
+        if missing:
+            # созданные после загрузки справочника или слишком большой
+            # справочник: один запрос на все недостающие
+            found.update(
+                (obj.slug, obj)
+                for obj in self.model.objects.filter(slug__in=missing)
+            )
+        return found
+
+    def clear(self):
+        with self.lock:
+            self.version = self.objects = None
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def catalog_for(model):
+    with _catalogs_lock:
+        if model not in _catalogs:
+            _catalogs[model] = SlugCatalog(model)
+        return _catalogs[model]
+
+
+def clear_catalogs():
+    with _catalogs_lock:
+        for catalog in _catalogs.values():
+            catalog.clear()
@@ -0,0 +1,80 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+
+from api.v1.cache import get_last_modified, get_versions, replica_may_lag
+
+
+def make_etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+class ConditionalListMixin:
+    """ETag и Last-Modified для списка, 304 до сериализации.
+
+    Валидатор списка строится из версий моделей etag_models. Ответ с
+    реплики вскоре после изменения уходит без валидаторов: клиент не
+    должен запомнить устаревшие данные под новой версией.
+    """
+
+    etag_models = ()
+
+    def get_list_validators(self, request):
+        if replica_may_lag(self.etag_models):
+            return None, None
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        versions = get_versions(self.etag_models)
+        etag = make_etag(request.path, params, *versions)
+        return etag, get_last_modified(self.etag_models)
+
+    def conditional(self, request, validators, handler, *args, **kwargs):
+        etag, last_modified = validators
+        if etag is not None:
+            not_modified = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if not_modified is not None:
+                return not_modified
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(
+            request, self.get_list_validators(request),
+            super().list, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """Добавляет условный GET для объекта.
+
+    Валидатор объекта — его updated_at и версии etag_detail_models.
+    """
+
+    etag_detail_models = ()
+
+    def get_detail_validators(self, request):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated_at = self.get_queryset().prefetch_related(None).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None or replica_may_lag(self.etag_detail_models):
+            return None, None
+        versions = get_versions(self.etag_detail_models)
+        etag = make_etag(request.path, updated_at.isoformat(), *versions)
+        last_modified = max(
+            int(updated_at.timestamp()),
+            get_last_modified(self.etag_detail_models)
+        )
+        return etag, last_modified
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            request, self.get_detail_validators(request),
+            super().retrieve, *args, **kwargs
+        )
@@ -1,5 +1,7 @@
+from django.db.models import F
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.filters import OrderingFilter
+from reviews.models import Title, rating_sort_expression
 
 
 class TitleFilter(filters.FilterSet):
@@ -9,13 +11,65 @@ class TitleFilter(filters.FilterSet):
     year = filters.NumberFilter(
         field_name='year'
     )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
     category = filters.CharFilter(
         field_name='category__slug'
     )
     genre = filters.CharFilter(
         field_name='genre__slug'
     )
+    search = filters.CharFilter(
+        method='filter_search'
+    )
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'category', 'genre')
+        fields = (
+            'name', 'year', 'year_min', 'year_max', 'category', 'genre',
+            'search'
+        )
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """Сортировка произведений только по полям с индексом.
+
+    Последним ключом добавляется id в том же направлении, что и сортировка,
+    чтобы порядок был однозначным и совпадал с составными индексами.
+    """
+
+    ordering_fields = ('rating', 'year', 'reviews_count', 'name')
+    expressions = {
+        'rating': rating_sort_expression,
+        'year': lambda: F('year'),
+        'reviews_count': lambda: F('rating_count'),
+        'name': lambda: F('name'),
+        'id': lambda: F('id'),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        ordering = list(ordering) + [
+            '-id' if ordering[-1].startswith('-') else 'id'
+        ]
+        return queryset.order_by(*[
+            self.get_expression(field) for field in ordering
+        ])
+
+    def get_expression(self, field):
+        name = field.lstrip('-')
+        expression = self.expressions[name]()
+        if field.startswith('-'):
+            return expression.desc()
+        return expression.asc()
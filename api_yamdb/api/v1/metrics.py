@@ -0,0 +1,292 @@
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from api.middleware import AsyncCapableMiddleware, is_api
+from api.v1.slow_queries import is_slow, log_slow_query
+from api_yamdb.postgresql_pool.pool import pool_stats
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+SUMS = (
+    'db_queries', 'db_seconds', 'serialize_seconds', 'render_seconds',
+    'response_bytes'
+)
+POOL_GAUGES = ('max_size', 'open', 'idle', 'in_use', 'wait_max_seconds')
+POOL_COUNTERS = (
+    'opened', 'closed', 'checkouts', 'waits', 'exhausted', 'health_checks',
+    'health_check_failures', 'wait_seconds'
+)
+
+_stats = ContextVar('request_stats', default=None)
+# имя файла включает время старта, чтобы новый процесс с тем же pid
+# не затёр счётчики завершившегося
+PROCESS_ID = f'{os.getpid()}-{time.time_ns()}'
+
+
+class RequestStats:
+
+    def __init__(self, request=None):
+        self.request = request
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _stats.get()
+    start = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+    if stats is not None and not many and is_slow(elapsed):
+        log_slow_query(
+            context['connection'], sql, params, elapsed, stats.request
+        )
+    return result
+
+
+def add_query_counter(sender, connection, **kwargs):
+    """Ставит count_query на каждое новое соединение.
+
+    Обёртка считает запросы, только пока в контексте есть RequestStats
+    запроса, поэтому одинаково работает в потоке WSGI, в общем потоке
+    ASGI и в потоках асинхронных представлений. Она встаёт первой:
+    execute_wrapper() снимает последнюю обёртку списка.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class SerializeTimingMixin:
+    """Время сериализаторов списка и объекта в RequestStats запроса.
+
+    Сериализатор для чтения сразу строит data под таймером, а list и
+    retrieve берут уже готовый результат: Serializer кэширует data.
+    Ленивый queryset без пагинации выполняется здесь же, так что его
+    запрос попадает и в db_seconds.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        stats = _stats.get()
+        if (stats is not None and 'data' not in kwargs
+                and (args or 'instance' in kwargs)):
+            start = time.perf_counter()
+            serializer.data
+            stats.serialize_seconds += time.perf_counter() - start
+        return serializer
+
+
+def empty_series():
+    return {
+        'count': 0,
+        'latency_seconds': 0.0,
+        'buckets': [0] * len(LATENCY_BUCKETS),
+        'statuses': {},
+        **dict.fromkeys(SUMS, 0),
+    }
+
+
+class Registry:
+    """Метрики процесса, периодически сбрасываемые в файл.
+
+    Каждый воркер gunicorn пишет свой файл в METRICS_DIR, эндпоинт
+    метрик складывает все файлы, так что результат не зависит от того,
+    какой воркер принял запрос. Вместе со счётчиками запросов в файл
+    попадает состояние пулов соединений процесса на момент сброса.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = defaultdict(empty_series)
+        self.flushed_at = 0.0
+
+    def observe(self, route, method, status, latency, stats, size):
+        with self.lock:
+            series = self.series[f'{route} {method}']
+            series['count'] += 1
+            series['latency_seconds'] += latency
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    series['buckets'][index] += 1
+            status = str(status)
+            statuses = series['statuses']
+            statuses[status] = statuses.get(status, 0) + 1
+            series['db_queries'] += stats.db_queries
+            series['db_seconds'] += stats.db_seconds
+            series['serialize_seconds'] += stats.serialize_seconds
+            series['render_seconds'] += stats.render_seconds
+            series['response_bytes'] += size
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if time.monotonic() - self.flushed_at > interval:
+            self.flush()
+
+    def flush(self):
+        pools = pool_stats()
+        with self.lock:
+            data = json.dumps({'requests': self.series, 'pools': pools})
+            self.flushed_at = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'{PROCESS_ID}.json')
+        temp = f'{path}.tmp'
+        with open(temp, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(temp, path)
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+        self.flush()
+
+
+registry = Registry()
+
+
+def merge_pool(total, stats):
+    for name in POOL_GAUGES + POOL_COUNTERS:
+        if name == 'wait_max_seconds':
+            total[name] = max(total.get(name, 0), stats.get(name, 0))
+        else:
+            total[name] = total.get(name, 0) + stats.get(name, 0)
+
+
+def collect():
+    """Сумма метрик запросов и пулов соединений всех процессов."""
+    registry.flush()
+    merged = defaultdict(empty_series)
+    pools = defaultdict(dict)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for alias, stats in data.get('pools', {}).items():
+            merge_pool(pools[alias], stats)
+        for key, values in data.get('requests', {}).items():
+            total = merged[key]
+            for name in ('count', 'latency_seconds', *SUMS):
+                # файлы воркеров прежней версии могут не знать новых полей
+                total[name] += values.get(name, 0)
+            total['buckets'] = [
+                a + b for a, b in zip(total['buckets'], values['buckets'])
+            ]
+            for status, number in values['statuses'].items():
+                total['statuses'][status] = (
+                    total['statuses'].get(status, 0) + number
+                )
+    return merged, pools
+
+
+def render_text(merged, pools=None):
+    """Текстовый формат Prometheus."""
+    lines = ['# TYPE api_request_duration_seconds histogram']
+    rows = sorted(merged.items())
+    for key, series in rows:
+        route, method = key.split(' ')
+        labels = f'route="{route}",method="{method}"'
+        for bound, number in zip(LATENCY_BUCKETS, series['buckets']):
+            lines.append(
+                f'api_request_duration_seconds_bucket{{{labels},'
+                f'le="{bound}"}} {number}'
+            )
+        lines += [
+            f'api_request_duration_seconds_bucket{{{labels},le="+Inf"}} '
+            f'{series["count"]}',
+            f'api_request_duration_seconds_sum{{{labels}}} '
+            f'{series["latency_seconds"]:.6f}',
+            f'api_request_duration_seconds_count{{{labels}}} '
+            f'{series["count"]}',
+        ]
+    lines.append('# TYPE api_requests_total counter')
+    for key, series in rows:
+        route, method = key.split(' ')
+        for status, number in sorted(series['statuses'].items()):
+            lines.append(
+                f'api_requests_total{{route="{route}",method="{method}",'
+                f'status="{status}"}} {number}'
+            )
+    for name in SUMS:
+        lines.append(f'# TYPE api_{name}_total counter')
+        for key, series in rows:
+            route, method = key.split(' ')
+            lines.append(
+                f'api_{name}_total{{route="{route}",method="{method}"}} '
+                f'{series[name]}'
+            )
+    pools = sorted((pools or {}).items())
+    # без пула соединений (обычный движок или sqlite) секции нет
+    for name in POOL_GAUGES + POOL_COUNTERS if pools else ():
+        if name in POOL_GAUGES:
+            metric, kind = f'api_db_pool_{name}', 'gauge'
+        else:
+            metric, kind = f'api_db_pool_{name}_total', 'counter'
+        lines.append(f'# TYPE {metric} {kind}')
+        for alias, stats in pools:
+            lines.append(f'{metric}{{database="{alias}"}} {stats[name]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Время ответа, запросы к базе, сериализация, рендеринг и размер
+    ответа по маршрутам API."""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not is_api(request):
+            return self.get_response(request)
+        stats = RequestStats(request)
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self.observe(request, response, stats, start)
+
+    async def __acall__(self, request):
+        if not is_api(request):
+            return await self.get_response(request)
+        stats = RequestStats(request)
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self.observe(request, response, stats, start)
+
+    def observe(self, request, response, stats, start):
+        latency = time.perf_counter() - start
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unmatched', request.method,
+            response.status_code, latency, stats,
+            0 if response.streaming else len(response.content)
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        stats = _stats.get()
+        if stats is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                stats.render_seconds += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,63 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class FixedOrderingCursorPagination(CursorPagination):
+    """Курсор всегда идёт по своему порядку, без учёта ?ordering=.
+
+    Позиция курсора строится по первому полю сортировки, а сортировки
+    вида рейтинга в DRF-курсоре не выразить.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """Пагинация по номерам страниц с курсорным режимом по запросу.
+
+    Курсорный режим включается параметром ``?pagination=cursor``
+    (или наличием ``?cursor=``) и не выполняет COUNT и OFFSET.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-pk',)
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_cursor_paginator(self):
+        paginator = FixedOrderingCursorPagination()
+        paginator.page_size = self.page_size
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.ordering = self.cursor_ordering
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(PageNumberOrCursorPagination):
+    cursor_ordering = ('name', 'id')
+
+
+class ReviewPagination(PageNumberOrCursorPagination):
+    cursor_ordering = ('-pub_date', '-id')
+
+
+class CommentPagination(PageNumberOrCursorPagination):
+    cursor_ordering = ('-pub_date', '-id')
@@ -19,7 +19,7 @@ class IsAuthOrStaffOrReadOnly(permissions.BasePermission):
             (request.method in permissions.SAFE_METHODS)
             or request.user.is_admin
             or request.user.is_moderator
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
 
     def has_permission(self, request, view):
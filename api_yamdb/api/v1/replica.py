@@ -0,0 +1,119 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.middleware import AsyncCapableMiddleware
+
+REPLICA = 'replica'
+PIN_KEY = 'api:replica:pin:{}'
+
+_state = ContextVar('replica_state', default=None)
+
+
+class RequestState:
+    """Куда читать в рамках одного запроса."""
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.written = False
+
+
+class ReplicaRouter:
+    """Чтение в GET-запросах к API идёт на реплику.
+
+    На основную базу остаются записи, чтения после записи в том же
+    запросе, чтения внутри транзакций и все запросы пользователя в
+    течение REPLICA_STICKY_SECONDS после его последней записи.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (state is None or not state.replica or state.written
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def reads_replica():
+    """Читает ли текущий запрос с реплики."""
+    return ReplicaRouter().db_for_read(None) == REPLICA
+
+
+def token_user_id(request):
+    """id пользователя из JWT без запроса к базе."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = header and auth.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+def uses_replica(request):
+    return (REPLICA in settings.DATABASES
+            and request.path.startswith('/api/v1/'))
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """Отмечает безопасные запросы к API, которые можно читать с реплики,
+    и закрепляет пользователя за основной базой после его записи."""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not uses_replica(request):
+            return self.get_response(request)
+        user_id, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.pin(request, user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not uses_replica(request):
+            return await self.get_response(request)
+        user_id, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.pin(request, user_id)
+        return response
+
+    def start(self, request):
+        user_id = token_user_id(request)
+        pinned = user_id is not None and cache.get(PIN_KEY.format(user_id))
+        return user_id, _state.set(RequestState(
+            replica=request.method in SAFE_METHODS and not pinned
+        ))
+
+    def pin(self, request, user_id):
+        if request.method not in SAFE_METHODS and user_id is not None:
+            cache.set(
+                PIN_KEY.format(user_id), True,
+                timeout=settings.REPLICA_STICKY_SECONDS
+            )
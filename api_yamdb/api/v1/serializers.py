@@ -1,14 +1,18 @@
-from django.db.models import Avg
 from django.contrib.auth.tokens import default_token_generator
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
 from rest_framework.validators import UniqueValidator
 from http import HTTPStatus
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, User)
 from reviews.validators import year_validate
 from user.validators import validate_username
 
+from api.v1.catalog import catalog_for
+
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,6 +32,43 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """slug жанра или категории из каталога процесса вместо запроса
+    на каждое значение; со списком все slug ищутся разом."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CatalogManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        return self.to_internal_values([data])[0]
+
+    def to_internal_values(self, values):
+        if not all(isinstance(value, (str, int)) for value in values):
+            self.fail('invalid')
+        slugs = [str(value) for value in values]
+        found = catalog_for(self.get_queryset().model).get_many(slugs)
+        for slug in slugs:
+            if slug not in found:
+                self.fail('does_not_exist', slug_name=self.slug_field,
+                          value=smart_str(slug))
+        return [found[slug] for slug in slugs]
+
+
+class CatalogManyRelatedField(ManyRelatedField):
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.to_internal_values(list(data))
+
+
 class TitleSerializerRead(serializers.ModelSerializer):
     category = CategorySerializer(
         many=False,
@@ -37,7 +78,7 @@ class TitleSerializerRead(serializers.ModelSerializer):
         many=True,
         required=False
     )
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
@@ -60,18 +101,14 @@ class TitleSerializerRead(serializers.ModelSerializer):
             'category'
         )
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score'))['score__avg']
-        return rating
-
 
 class TitleSerializerCreate(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
         many=False
     )
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True,
@@ -120,21 +157,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('title',)
 
-    def validate(self, data):
-        request = self.context.get('request')
-        author = request.user
-        if request.method == 'POST':
-            title_id = self.context.get('view').kwargs.get('title_id')
-            title = get_object_or_404(Title, pk=title_id)
-            if Review.objects.filter(
-                    author=author,
-                    title=title
-            ).exists():
-                raise serializers.ValidationError(
-                    'нельзя оставить отзыв дважды'
-                )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -153,6 +175,29 @@ class CommentSerializer(serializers.ModelSerializer):
         )
 
 
+class RankedTitleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Title
+        fields = (
+            'id',
+            'name',
+            'year'
+        )
+
+
+class TitleRankingSerializer(serializers.ModelSerializer):
+    title = RankedTitleSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = (
+            'position',
+            'rating',
+            'reviews_count',
+            'title'
+        )
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("username", "email", "first_name",
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+from api.v1.authentication import forget_user
+from api.v1.cache import bump_version
+
+
+# версия имён пользователей: их показывают отзывы и комментарии, а
+# остальные поля профиля этим ответам не важны
+USERNAME_LABEL = 'username'
+
+
+def bump_label(label):
+    bump_version(label)
+    # повторно после коммита: ответ, закэшированный конкурентным запросом
+    # до коммита, содержит старые данные и не должен пережить транзакцию
+    transaction.on_commit(lambda: bump_version(label))
+
+
+def bump_model_version(sender, **kwargs):
+    bump_label(sender._meta.model_name)
+
+
+for model in (Title, Genre, Category, Review, Comment, User):
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_model_version(Title)
+
+
+@receiver(pre_save, sender=User)
+def check_username_change(sender, instance, raw, update_fields, **kwargs):
+    instance._username_changed = False
+    if raw or instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance._username_changed = username not in (None, instance.username)
+
+
+@receiver(post_save, sender=User)
+def bump_username_version(sender, instance, **kwargs):
+    # у удалённого пользователя отзывы и комментарии удаляются каскадом
+    # и сами поднимают свои версии
+    if getattr(instance, '_username_changed', False):
+        bump_label(USERNAME_LABEL)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    transaction.on_commit(lambda: forget_user(instance.pk))
@@ -0,0 +1,71 @@
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger('api.slow_queries')
+
+SAVEPOINT = 'slow_query_explain'
+EXPLAIN = {
+    'postgresql': 'EXPLAIN (ANALYZE, BUFFERS) ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+
+
+def is_slow(seconds):
+    threshold = settings.SLOW_QUERY_MS
+    return bool(threshold) and seconds * 1000 >= threshold
+
+
+def explain(connection, sql, params):
+    """План запроса; ANALYZE на PostgreSQL выполняет запрос ещё раз.
+
+    Курсор берётся мимо обёрток Django, чтобы сам EXPLAIN не попал в
+    метрики и не был снова залогирован как медленный; поэтому ошибки
+    приходят от драйвера, а не DatabaseError Django. Внутри транзакции
+    EXPLAIN идёт в точке сохранения: его ошибка не должна прервать
+    транзакцию запроса.
+    """
+    prefix = EXPLAIN.get(connection.vendor, 'EXPLAIN ')
+    savepoint = connection.in_atomic_block
+    ops = connection.ops
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute(ops.savepoint_create_sql(SAVEPOINT))
+        try:
+            cursor.execute(prefix + sql, params)
+            plan = '\n'.join(
+                ' '.join(str(value) for value in row)
+                for row in cursor.fetchall()
+            )
+        except connection.Database.Error as error:
+            if savepoint:
+                cursor.execute(ops.savepoint_rollback_sql(SAVEPOINT))
+            plan = f'EXPLAIN failed: {error}'
+        if savepoint:
+            cursor.execute(ops.savepoint_commit_sql(SAVEPOINT))
+        return plan
+    except connection.Database.Error as error:
+        return f'EXPLAIN failed: {error}'
+    finally:
+        cursor.close()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None) if request else None
+    if match is None:
+        return 'unknown view'
+    return f'{match.view_name} {request.method} {request.get_full_path()}'
+
+
+def log_slow_query(connection, sql, params, seconds, request):
+    """Пишет в лог медленный запрос, его план и представление."""
+    # EXPLAIN ANALYZE изменяющего запроса изменил бы данные второй раз
+    if sql.lstrip()[:6].upper() == 'SELECT':
+        plan = explain(connection, sql, params)
+    else:
+        plan = 'not a SELECT, no plan'
+    logger.warning(
+        'slow query %.1f ms in %s\n%s\nparams: %r\n%s',
+        seconds * 1000, view_name(request), sql, params, plan
+    )
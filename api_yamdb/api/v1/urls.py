@@ -1,8 +1,11 @@
 from api.v1.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                          ReviewViewSet, TitleViewSet, UserViewSet)
+                          LeaderboardViewSet, ReviewViewSet, TitleViewSet,
+                          UserViewSet)
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from api.v1.views import register, get_jwt_token
+from api.v1.async_views import async_urls
+from api.v1.views import export_titles, metrics, register, get_jwt_token
 
 
 router = DefaultRouter()
@@ -19,10 +22,19 @@ router.register(
     CommentViewSet,
     basename='comments'
 )
+router.register(
+    r'leaderboards/(?P<kind>genres|categories)/(?P<slug>[-a-zA-Z0-9_]+)',
+    LeaderboardViewSet,
+    basename='leaderboards'
+)
 router.register(r"users", UserViewSet)
 
 urlpatterns = [
-    path('', include(router.urls)),
+    path('export/titles/', export_titles, name='export_titles'),
+    path('metrics/', metrics, name='metrics'),
+    path('', include(
+        async_urls(router.urls) if settings.ASYNC_API_VIEWS else router.urls
+    )),
     path('auth/signup/', register, name='register'),
     path('auth/token/', get_jwt_token, name='token')
 ]
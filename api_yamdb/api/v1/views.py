@@ -1,10 +1,13 @@
 from http import HTTPStatus
 from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (action, api_view,
+                                       permission_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
@@ -12,20 +15,30 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, User, Title
-from api_yamdb.settings import ADMIN_EMAIL
-from api.v1.filters import TitleFilter
+from rest_framework.settings import api_settings
+from reviews.exports import FORMATS, export_lines
+from reviews.models import (Category, Genre, Review, Title, TitleRanking,
+                            User)
+from user.models import OutboxEmail
+from api.v1.authentication import access_token_for
+from api.v1.cache import CachedListMixin
+from api.v1.conditional import ConditionalGetMixin, ConditionalListMixin
+from api.v1.filters import TitleFilter, TitleOrderingFilter
+from api.v1.metrics import SerializeTimingMixin, collect, render_text
+from api.v1.pagination import (CommentPagination, ReviewPagination,
+                               TitlePagination)
 from api.v1.permissions import (IsAdminOrReadOnly, IsAuthOrStaffOrReadOnly,
                                 OwnerOrAdmins)
 from api.v1.serializers import (CategorySerializer, CommentSerializer,
                                 GenreSerializer, MeSerializer,
                                 RegisterDataSerializer, ReviewSerializer,
+                                TitleRankingSerializer,
                                 TitleSerializerCreate, TitleSerializerRead,
                                 TokenSerializer, UserSerializer)
 
 
 class GetPostDestroy(
+    SerializeTimingMixin,
     ListModelMixin,
     CreateModelMixin,
     DestroyModelMixin,
@@ -35,15 +48,27 @@ class GetPostDestroy(
     pass
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    SerializeTimingMixin,
+    ConditionalGetMixin,
+    CachedListMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для произведений"""
 
-    queryset = Title.objects.all()
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related(
+        'genre'
+    ).with_rating()
     serializer_class = TitleSerializerRead
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filterset_class = TitleFilter
+    cache_models = ('title', 'genre', 'category', 'review')
+    etag_models = cache_models
+    etag_detail_models = ('genre', 'category')
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH'):
@@ -51,7 +76,7 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleSerializerRead
 
 
-class GenreViewSet(GetPostDestroy):
+class GenreViewSet(ConditionalListMixin, CachedListMixin, GetPostDestroy):
     """Вьюсет для жанров"""
 
     queryset = Genre.objects.all()
@@ -64,9 +89,15 @@ class GenreViewSet(GetPostDestroy):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_models = ('genre',)
+    etag_models = cache_models
 
 
-class CategoryViewSet(GetPostDestroy):
+class CategoryViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
+    GetPostDestroy
+):
     """Вьюсет для катекорий"""
 
     queryset = Category.objects.all()
@@ -79,43 +110,93 @@ class CategoryViewSet(GetPostDestroy):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_models = ('category',)
+    etag_models = cache_models
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    SerializeTimingMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для отзывов"""
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthOrStaffOrReadOnly,)
+    pagination_class = ReviewPagination
+    # из пользователя в ответе только username автора
+    etag_models = ('review', 'username')
+    etag_detail_models = ('username',)
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), id=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    def get_list_validators(self, request):
+        # удаление произведения без отзывов не меняет версий списка:
+        # 404 должен прийти раньше 304
+        self.get_title()
+        return super().get_list_validators(request)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(
-            author=self.request.user,
-            title=title
-        )
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        title = get_object_or_404(Title.objects.only('id'), id=title_id)
+        # повторный отзыв ловит уникальный индекс (title, author),
+        # а не предварительная проверка, которая гоняется с вставкой
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user,
+                    title=title
+                )
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title,
+                author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'нельзя оставить отзыв дважды'
+                ]
+            })
+
+
+class CommentViewSet(
+    SerializeTimingMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для комментариев"""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthOrStaffOrReadOnly,)
+    pagination_class = CommentPagination
+    etag_models = ('comment', 'username')
+    etag_detail_models = ('username',)
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id'),
+                id=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id')
+            )
+        return self._review
+
+    def get_list_validators(self, request):
+        # отзыв без комментариев удаляется, не меняя версий списка
+        self.get_review()
+        return super().get_list_validators(request)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(
-            Review,
-            id=review_id,
-            title=title_id
-        )
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
         review_id = self.kwargs.get('review_id')
@@ -129,7 +210,37 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class LeaderboardViewSet(
+    SerializeTimingMixin,
+    ListModelMixin,
+    viewsets.GenericViewSet
+):
+    """Вьюсет для топов жанров и категорий"""
+
+    serializer_class = TitleRankingSerializer
+    pagination_class = None
+    group_models = {
+        'genres': (TitleRanking.GENRE, Genre),
+        'categories': (TitleRanking.CATEGORY, Category),
+    }
+
+    def get_queryset(self):
+        kind, model = self.group_models[self.kwargs.get('kind')]
+        group = model.objects.filter(slug=self.kwargs.get('slug'))
+        return TitleRanking.objects.filter(
+            kind=kind,
+            group_id__in=group.values('pk')
+        ).select_related('title')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not response.data:
+            _, model = self.group_models[self.kwargs.get('kind')]
+            get_object_or_404(model, slug=self.kwargs.get('slug'))
+        return response
+
+
+class UserViewSet(SerializeTimingMixin, viewsets.ModelViewSet):
     """Вьюсет для пользователей"""
 
     queryset = User.objects.all()
@@ -147,7 +258,8 @@ class UserViewSet(viewsets.ModelViewSet):
             url_path="me",
             permission_classes=(IsAuthenticated,))
     def users_own_profile(self, request):
-        user = request.user
+        # request.user может быть собран из токена, профиль читаем из базы
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == "GET":
             serializer = MeSerializer(user)
             return Response(serializer.data, status=HTTPStatus.OK)
@@ -161,6 +273,46 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=HTTPStatus.OK)
 
 
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+@api_view(["GET"])
+@permission_classes((OwnerOrAdmins,))
+def export_titles(request):
+    """Потоковая выгрузка всех произведений одним ответом.
+
+    ?output=ndjson|csv (format занят DRF), ?reviews=1 и ?comments=1
+    добавляют отзывы и комментарии.
+    """
+    output = request.query_params.get('output', 'ndjson')
+    if output not in FORMATS:
+        raise ValidationError({'output': [f'допустимо: {", ".join(FORMATS)}']})
+    flags = {
+        name: request.query_params.get(name) in ('1', 'true')
+        for name in ('reviews', 'comments')
+    }
+    response = StreamingHttpResponse(
+        export_lines(output, **flags),
+        content_type=EXPORT_CONTENT_TYPES[output]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="titles.{output}"'
+    )
+    return response
+
+
+@api_view(["GET"])
+@permission_classes((OwnerOrAdmins,))
+def metrics(request):
+    """Метрики API всех воркеров в текстовом формате Prometheus."""
+    return HttpResponse(
+        render_text(*collect()), content_type='text/plain; version=0.0.4'
+    )
+
+
 @api_view(["POST"])
 def get_jwt_token(request):
     serializer = TokenSerializer(data=request.data)
@@ -169,7 +321,7 @@ def get_jwt_token(request):
         User,
         username=serializer.validated_data["username"]
     )
-    token = AccessToken.for_user(user)
+    token = access_token_for(user)
     return Response({"token": str(token)}, status=HTTPStatus.OK)
 
 
@@ -197,10 +349,9 @@ def register(request):
             serializer.is_valid(raise_exception=True)
 
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    OutboxEmail.objects.enqueue(
+        user,
         subject="YaMDb registration",
-        message=f"Your confirmation code: {confirmation_code}",
-        from_email=ADMIN_EMAIL,
-        recipient_list=[user.email],
+        body=f"Your confirmation code: {confirmation_code}",
     )
     return Response(serializer.data, status=HTTPStatus.OK)
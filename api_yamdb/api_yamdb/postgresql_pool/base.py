@@ -0,0 +1,46 @@
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from .pool import get_pool
+
+POOL_OPTIONS = {
+    'MAX_SIZE': 'max_size',
+    'TIMEOUT': 'timeout',
+    'CHECK_AFTER': 'check_after',
+    'MAX_LIFETIME': 'max_lifetime',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL, у которого соединения берутся из пула процесса.
+
+    Закрытие соединения Django (в конце запроса при CONN_MAX_AGE = 0)
+    возвращает его в пул, а не рвёт; настройки пула задаются ключом
+    POOL в описании базы.
+    """
+
+    # не pool: под этим именем Django 5.1+ держит свой пул psycopg 3
+    @property
+    def connection_pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        return get_pool(self.alias, {
+            POOL_OPTIONS[name]: value for name, value in options.items()
+        })
+
+    def get_new_connection(self, conn_params):
+        connection = self.connection_pool.checkout(
+            partial(super().get_new_connection, conn_params)
+        )
+        # у соединения из пула уровень изоляции выставлен при открытии
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            # закрытое внутри atomic соединение Django ещё держит у себя,
+            # отдавать его другому потоку нельзя
+            with self.wrap_database_errors:
+                self.connection_pool.checkin(
+                    self.connection, discard=self.in_atomic_block
+                )
@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhausted(OperationalError):
+    """Свободного соединения не дождались за отведённое время."""
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений psycopg2 одного процесса.
+
+    Свободные соединения хранятся стопкой, чтобы чаще переиспользовать
+    самые «тёплые». Соединение, простоявшее дольше check_after секунд,
+    перед выдачей проверяется SELECT 1; прожившее дольше max_lifetime
+    закрывается.
+    """
+
+    def __init__(self, max_size=10, timeout=5.0, check_after=30.0,
+                 max_lifetime=1800.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.born = {}
+        self.counters = dict.fromkeys(
+            ('opened', 'closed', 'checkouts', 'waits', 'exhausted',
+             'health_checks', 'health_check_failures'), 0
+        )
+        self.wait_seconds = 0.0
+        self.wait_max = 0.0
+
+    def checkout(self, connect):
+        start = time.monotonic()
+        if not self.slots.acquire(timeout=self.timeout):
+            with self.lock:
+                self.counters['exhausted'] += 1
+            logger.warning(
+                'connection pool exhausted: %s connections in use for %ss',
+                self.max_size, self.timeout
+            )
+            raise PoolExhausted(
+                f'no free connection in the pool after {self.timeout}s'
+            )
+        waited = time.monotonic() - start
+        with self.lock:
+            self.counters['checkouts'] += 1
+            if waited > 0.001:
+                self.counters['waits'] += 1
+            self.wait_seconds += waited
+            self.wait_max = max(self.wait_max, waited)
+        try:
+            return self.reuse() or self.open(connect)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def reuse(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, last_used = self.idle.pop()
+            now = time.monotonic()
+            if (connection.closed
+                    or now - self.born[id(connection)] > self.max_lifetime):
+                self.discard(connection)
+            elif (now - last_used > self.check_after
+                    and not self.is_healthy(connection)):
+                self.discard(connection)
+            else:
+                return connection
+
+    def open(self, connect):
+        connection = connect()
+        with self.lock:
+            self.born[id(connection)] = time.monotonic()
+            self.counters['opened'] += 1
+        return connection
+
+    def is_healthy(self, connection):
+        with self.lock:
+            self.counters['health_checks'] += 1
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except Exception:
+            with self.lock:
+                self.counters['health_check_failures'] += 1
+            return False
+        return True
+
+    def checkin(self, connection, discard=False):
+        """Возвращает соединение; незавершённая транзакция откатывается."""
+        try:
+            if not discard and not connection.closed:
+                if connection.get_transaction_status() != (
+                    TRANSACTION_STATUS_IDLE
+                ):
+                    connection.rollback()
+                discard = connection.get_transaction_status() != (
+                    TRANSACTION_STATUS_IDLE
+                )
+        except Exception:
+            discard = True
+        if discard or connection.closed:
+            self.discard(connection)
+        else:
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.lock:
+            self.born.pop(id(connection), None)
+            self.counters['closed'] += 1
+
+    def stats(self):
+        with self.lock:
+            idle = len(self.idle)
+            return {
+                'max_size': self.max_size,
+                'open': len(self.born),
+                'idle': idle,
+                'in_use': len(self.born) - idle,
+                **self.counters,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'wait_max_seconds': round(self.wait_max, 6),
+            }
+
+
+def get_pool(alias, options):
+    """Пул для алиаса базы в текущем процессе.
+
+    Ключ включает pid: после fork (gunicorn --preload) дочерний процесс
+    не должен делить сокеты с родителем.
+    """
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(**options)
+        return _pools[key]
+
+
+def pool_stats():
+    """Метрики всех пулов текущего процесса по алиасам баз."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {
+            alias: pool for (alias, key_pid), pool in _pools.items()
+            if key_pid == pid
+        }
+    return {alias: pool.stats() for alias, pool in pools.items()}
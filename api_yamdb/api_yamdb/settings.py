@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'api.apps.ApiConfig',
@@ -38,12 +39,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.v1.metrics.MetricsMiddleware',
+    'api.v1.replica.ReplicaMiddleware',
+    # запросы к /api/ проходят мимо сессий, CSRF, сообщений и X-Frame-Options
+    'api.middleware.ApiExemptSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ApiExemptCsrfViewMiddleware',
+    'api.middleware.ApiExemptAuthenticationMiddleware',
+    'api.middleware.ApiExemptMessageMiddleware',
+    'api.middleware.ApiExemptXFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -73,10 +77,47 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        # постоянные соединения; с пулом (DB_ENGINE=api_yamdb.postgresql_pool)
+        # ставится 0, тогда соединение возвращается в пул после запроса
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'CHECK_AFTER': float(os.getenv('DB_POOL_CHECK_AFTER', default=30)),
+            'MAX_LIFETIME': float(os.getenv('DB_POOL_MAX_LIFETIME', default=1800)),
+        },
     }
 }
 
+# реплика для чтения включается, если задан её хост
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+    }
+    DATABASE_ROUTERS = ['api.v1.replica.ReplicaRouter']
+
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='/tmp/api_yamdb_cache'),
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+LEADERBOARD_SIZE = 50
+
+# асинхронные эндпоинты чтения; asgi.py включает их сам
+ASYNC_API_VIEWS = os.getenv('API_ASYNC_VIEWS', default='') == '1'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,9 +155,18 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_BACKOFF = 30
+
+EMAIL_OUTBOX_MAX_BACKOFF = 3600
+
+# на столько секунд воркер забирает письма пачки себе на время отправки
+EMAIL_OUTBOX_LEASE = 300
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -125,6 +175,17 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 5,
 }
 
+# метрики запросов к API: каждый процесс пишет свой файл в METRICS_DIR
+METRICS_DIR = os.getenv('METRICS_DIR', default='/tmp/api_yamdb_metrics')
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', default=5))
+# запросы API дольше стольких миллисекунд пишутся в лог api.slow_queries
+# вместе с планом EXPLAIN; 0 — выключено
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', default=0))
+
+# пользователи, уже найденные по токену, в памяти процесса
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', default=1024))
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', default=60))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
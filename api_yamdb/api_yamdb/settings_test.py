@@ -0,0 +1,47 @@
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import BASE_DIR
+
+# тесты с базой данных гоняются на sqlite, чтобы не требовать postgres в CI;
+# база в файле, а не в памяти, чтобы конкурентные тесты ждали блокировку
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_test.sqlite3'),
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'db_test.sqlite3'),
+        },
+    },
+    # отдельная база вместо реплики; роутер включают только тесты реплики
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_test_replica.sqlite3'),
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'db_test_replica.sqlite3'),
+        },
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# TEST_DB_HOST запускает тесты на PostgreSQL (джоб tests-postgres в CI):
+# так проверяются COPY, полнотекстовый поиск и планы запросов postgres
+if os.getenv('TEST_DB_HOST'):
+    POSTGRES = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'USER': os.getenv('POSTGRES_USER', default='postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
+        'HOST': os.getenv('TEST_DB_HOST'),
+        'PORT': os.getenv('TEST_DB_PORT', default=5432),
+    }
+    DATABASES = {
+        'default': {**POSTGRES, 'NAME': 'yamdb',
+                    'TEST': {'NAME': 'test_yamdb'}},
+        'replica': {**POSTGRES, 'NAME': 'yamdb_replica',
+                    'TEST': {'NAME': 'test_yamdb_replica'}},
+    }
@@ -14,11 +14,14 @@ class TitleAdmin(admin.ModelAdmin):
     )
     search_fields = (
         'name',
-        'year',
-        'category'
     )
     empty_value_display = 'пусто'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+
 
 class GenreAdmin(admin.ModelAdmin):
     fields = (
@@ -0,0 +1,218 @@
+"""Синтетический каталог для замеров производительности.
+
+Строки пишутся пачками через bulk_create с явными id, поэтому связи
+строятся без чтения из базы, а рейтинг произведений считается сразу
+при генерации отзывов.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews.importing import batches, keep_dates
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+WORDS = (
+    'star', 'war', 'love', 'night', 'city', 'dark', 'king', 'ring', 'lost',
+    'river', 'ghost', 'summer', 'winter', 'blood', 'dream', 'fire', 'stone',
+    'queen', 'empire', 'return', 'secret', 'garden', 'silent', 'storm',
+    'последний', 'герой', 'тихий', 'дон', 'мастер', 'маргарита', 'война',
+    'мир', 'белый', 'солнце', 'пустыня', 'брат', 'сестра', 'ночь', 'город',
+)
+# доли строк каждой таблицы от общего объёма каталога
+SHARES = {
+    'users': 0.02,
+    'titles': 0.08,
+    'genre_links': 0.16,
+    'reviews': 0.34,
+    'comments': 0.4,
+}
+CATEGORIES = 10
+GENRES = 30
+MAX_GENRES = 3
+# средняя оценка произведения и разброс оценок вокруг неё
+MEAN_SCORES = (3.0, 9.5)
+SCORE_SPREAD = 1.8
+ROLES = (('user', 0.95), ('moderator', 0.04), ('admin', 0.01))
+PERIOD = timedelta(days=5 * 365)
+
+
+def confirm_target(confirmed, using='default'):
+    """Синтетика пишется в настроенную базу: вне DEBUG нужен --yes."""
+    if confirmed or settings.DEBUG:
+        return
+    connection = connections[using]
+    raise CommandError(
+        f'this writes synthetic rows to the {connection.vendor} database '
+        f'"{connection.settings_dict["NAME"]}"; pass --yes to confirm'
+    )
+
+
+def plan(scale):
+    """Число строк каждой таблицы для каталога примерно из scale строк."""
+    counts = {
+        name: max(1, int(scale * share)) for name, share in SHARES.items()
+    }
+    counts['categories'] = CATEGORIES
+    counts['genres'] = GENRES
+    return counts
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def sentence(low, high):
+    return ' '.join(random.choices(WORDS, k=random.randint(low, high)))
+
+
+def random_date(now):
+    return now - PERIOD * random.random()
+
+
+def spread(total, parts):
+    """Случайное число на каждую часть, в среднем total / parts.
+
+    Экспоненциальное распределение даёт длинный хвост: у немногих
+    произведений много отзывов, у большинства — несколько.
+    """
+    mean = total / parts
+    return [round(random.expovariate(1 / mean)) for _ in range(parts)]
+
+
+def score(mean):
+    return min(10, max(1, round(random.gauss(mean, SCORE_SPREAD))))
+
+
+class Generator:
+    """Дописывает каталог к уже имеющимся данным."""
+
+    def __init__(self, scale, batch_size=2000, seed=0, using='default'):
+        self.counts = plan(scale)
+        self.batch_size = batch_size
+        self.using = using
+        self.now = timezone.now()
+        random.seed(seed)
+
+    def bulk_create(self, model, objects):
+        model.objects.using(self.using).bulk_create(
+            objects, batch_size=self.batch_size
+        )
+        return len(objects)
+
+    def users(self):
+        first = next_id(User)
+        self.user_ids = range(first, first + self.counts['users'])
+        roles, weights = zip(*ROLES)
+        for ids in batches(self.user_ids, self.batch_size):
+            yield self.bulk_create(User, [
+                User(
+                    id=pk, username=f'bench{pk}',
+                    email=f'bench{pk}@example.com', password='!',
+                    role=random.choices(roles, weights)[0],
+                    bio=sentence(0, 8)
+                )
+                for pk in ids
+            ])
+
+    def groups(self):
+        for model, label, key in ((Category, 'category', 'categories'),
+                                  (Genre, 'genre', 'genres')):
+            first = next_id(model)
+            ids = range(first, first + self.counts[key])
+            setattr(self, f'{label}_ids', ids)
+            yield self.bulk_create(model, [
+                model(id=pk, name=sentence(1, 2), slug=f'bench-{label}-{pk}')
+                for pk in ids
+            ])
+
+    def titles(self):
+        """Произведения пачками, вместе с их жанрами, отзывами и
+        комментариями, чтобы не держать в памяти весь каталог."""
+        first = next_id(Title)
+        self.review_id = next_id(Review)
+        self.comment_id = next_id(Comment)
+        titles = self.counts['titles']
+        reviews = spread(self.counts['reviews'], titles)
+        for ids in batches(range(first, first + titles), self.batch_size):
+            with transaction.atomic(using=self.using):
+                created = self.title_batch(
+                    ids, reviews[ids[0] - first:ids[-1] - first + 1]
+                )
+            yield created
+
+    def title_batch(self, ids, reviews):
+        objects, links, review_objects = [], [], []
+        genres_per_title = self.counts['genre_links'] / self.counts['titles']
+        for pk, count in zip(ids, reviews):
+            count = min(count, len(self.user_ids))
+            title_reviews = self.make_reviews(pk, count)
+            review_objects += title_reviews
+            objects.append(Title(
+                id=pk, name=sentence(2, 4), year=random.randint(1900, 2023),
+                description=sentence(8, 30),
+                category_id=random.choice(self.category_ids),
+                rating_sum=sum(review.score for review in title_reviews),
+                rating_count=len(title_reviews), updated_at=self.now
+            ))
+            links += [
+                Title.genre.through(title_id=pk, genre_id=genre_id)
+                for genre_id in random.sample(
+                    self.genre_ids,
+                    min(MAX_GENRES, len(self.genre_ids),
+                        int(random.expovariate(1 / genres_per_title)) + 1)
+                )
+            ]
+        with keep_dates(Title):
+            created = self.bulk_create(Title, objects)
+        created += self.bulk_create(Title.genre.through, links)
+        with keep_dates(Review):
+            created += self.bulk_create(Review, review_objects)
+        with keep_dates(Comment):
+            created += self.bulk_create(
+                Comment, self.make_comments(review_objects)
+            )
+        return created
+
+    def make_reviews(self, title_id, count):
+        # авторы без повторов: один отзыв на произведение от автора
+        mean = random.uniform(*MEAN_SCORES)
+        reviews = []
+        for author_id in random.sample(self.user_ids, count):
+            date = random_date(self.now)
+            reviews.append(Review(
+                id=self.review_id, title_id=title_id, author_id=author_id,
+                score=score(mean), text=sentence(5, 40), pub_date=date,
+                updated_at=date
+            ))
+            self.review_id += 1
+        return reviews
+
+    def make_comments(self, reviews):
+        counts = spread(
+            self.counts['comments'] * len(reviews) / self.counts['reviews'],
+            len(reviews)
+        ) if reviews else []
+        comments = []
+        for review, count in zip(reviews, counts):
+            for _ in range(count):
+                date = review.pub_date + (self.now - review.pub_date) * (
+                    random.random()
+                )
+                comments.append(Comment(
+                    id=self.comment_id, review_id=review.id,
+                    author_id=random.choice(self.user_ids),
+                    text=sentence(3, 20), pub_date=date, updated_at=date
+                ))
+                self.comment_id += 1
+        return comments
+
+    def run(self):
+        """Итератор по числу вставленных строк после каждой пачки."""
+        yield from self.users()
+        yield from self.groups()
+        yield from self.titles()
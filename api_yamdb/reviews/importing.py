@@ -0,0 +1,359 @@
+import csv
+import json
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+DATA_DIR = os.path.join('static', 'data')
+
+
+def user_row(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+    )
+
+
+def category_row(row):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def genre_row(row):
+    return Genre(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def title_row(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row.get('description') or None,
+        category_id=row['category'] or None,
+        updated_at=timezone.now(),
+    )
+
+
+def review_row(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+        updated_at=row['pub_date'],
+    )
+
+
+def genre_title_row(row):
+    return Title.genre.through(
+        id=row['id'],
+        title_id=row['title_id'],
+        genre_id=row['genre_id'],
+    )
+
+
+def comment_row(row):
+    return Comment(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date'],
+        updated_at=row['pub_date'],
+    )
+
+
+# файл, модель и разбор строки, в порядке зависимостей по внешним ключам
+FILES = (
+    ('users.csv', User, user_row),
+    ('category.csv', Category, category_row),
+    ('genre.csv', Genre, genre_row),
+    ('titles.csv', Title, title_row),
+    ('review.csv', Review, review_row),
+    ('genre_title.csv', Title.genre.through, genre_title_row),
+    ('comments.csv', Comment, comment_row),
+)
+
+
+# этапы загрузки: файлы одного этапа не зависят друг от друга
+STAGES = (
+    ('users.csv', 'category.csv', 'genre.csv'),
+    ('titles.csv',),
+    ('review.csv', 'genre_title.csv'),
+    ('comments.csv',),
+)
+
+# колонки файлов в том виде, в каком их пишет экспорт
+COLUMNS = {
+    'users.csv': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category', 'description'),
+    'review.csv': (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    ),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+# поля, которых нет в файлах, но которые берутся из другой колонки
+DERIVED = {'updated_at': 'pub_date'}
+
+
+@contextmanager
+def keep_dates(model):
+    """Сохраняет даты из файла вместо auto_now/auto_now_add."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+def read_rows(file, offset=0):
+    """Строки CSV из двоичного файла и смещение после каждой из них.
+
+    Заголовок читается всегда, а данные — начиная с offset, так что
+    прерванную загрузку можно продолжить с сохранённого места.
+    """
+    header = next(csv.reader([file.readline().decode('utf-8')]))
+    position = max(offset, file.tell())
+    file.seek(position)
+
+    def lines():
+        nonlocal position
+        for line in iter(file.readline, b''):
+            position += len(line)
+            yield line.decode('utf-8')
+
+    for values in csv.reader(lines()):
+        yield dict(zip(header, values)), position
+
+
+def import_file(path, model, parse, batch_size, using='default', offset=0,
+                checkpoint=None):
+    """Загружает CSV пачками bulk_create.
+
+    Уже существующие строки пропускаются, поэтому повторный запуск
+    безопасен. Без checkpoint весь файл грузится в одной транзакции,
+    с ним каждая пачка фиксируется отдельно, после чего checkpoint
+    получает смещение. Возвращает число прочитанных строк.
+    """
+    count = 0
+    outer = (
+        transaction.atomic(using=using) if checkpoint is None
+        else nullcontext()
+    )
+    with open(path, 'rb') as file, outer, keep_dates(model):
+        for batch in batches(read_rows(file, offset), batch_size):
+            with transaction.atomic(
+                    using=using, savepoint=checkpoint is not None):
+                model.objects.using(using).bulk_create(
+                    [parse(row) for row, _ in batch],
+                    ignore_conflicts=True
+                )
+            count += len(batch)
+            if checkpoint is not None:
+                checkpoint(batch[-1][1])
+    return count
+
+
+class Checkpoint:
+    """Смещения в файлах, до которых данные уже сохранены в базе.
+
+    Хранится в JSON-файле и переписывается после каждой пачки;
+    без пути ничего не запоминает.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.offsets = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.offsets = json.load(file)
+
+    def __bool__(self):
+        return bool(self.path)
+
+    def get(self, name):
+        return self.offsets.get(name, 0)
+
+    def save(self, name, offset):
+        with self.lock:
+            self.offsets[name] = offset
+            if not self.path:
+                return
+            temp = f'{self.path}.tmp'
+            with open(temp, 'w', encoding='utf-8') as file:
+                json.dump(self.offsets, file)
+            os.replace(temp, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def reset_sequences(models, using='default'):
+    """После вставки явных id двигает счётчики автоинкремента."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def copy_supported(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def staging_select(model, header, staging, connection):
+    """Колонки вставки и SELECT из промежуточной таблицы.
+
+    Пустые строки превращаются в NULL так же, как при разборе строк
+    для bulk_create; недостающие поля получают значения по умолчанию.
+    """
+    quote = connection.ops.quote_name
+    columns, values, params = [], [], []
+    for name in header:
+        field = model._meta.get_field(name)
+        source = f'{staging}.{quote(name)}'
+        if field.null or not field.empty_strings_allowed:
+            source = f"NULLIF({source}, '')"
+        db_type = (
+            field.rel_db_type(connection) if field.primary_key
+            else field.db_type(connection)
+        )
+        columns.append(field.column)
+        values.append(f'{source}::{db_type}')
+    for field in model._meta.concrete_fields:
+        if field.column in columns:
+            continue
+        columns.append(field.column)
+        if DERIVED.get(field.name) in header:
+            values.append(
+                f'{staging}.{quote(DERIVED[field.name])}'
+                f'::{field.db_type(connection)}'
+            )
+        elif getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            values.append('now()')
+        else:
+            values.append('%s')
+            params.append(
+                field.get_db_prep_save(field.get_default(), connection)
+            )
+    return [quote(column) for column in columns], values, params
+
+
+def copy_file(path, model, using='default', offset=0):
+    """Загружает CSV через COPY FROM STDIN (только PostgreSQL).
+
+    Файл целиком копируется во временную таблицу, откуда одним
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING переносится в модель.
+    Данные читаются начиная с offset. Возвращает число прочитанных строк.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    staging = quote(f'import_{model._meta.db_table}')
+    with open(path, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8')]))
+        file.seek(max(offset, file.tell()))
+        staging_columns = ', '.join(quote(name) for name in header)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} '
+                f'({", ".join(quote(name) + " text" for name in header)})'
+            )
+            cursor.copy_expert(
+                f'COPY {staging} ({staging_columns}) FROM STDIN '
+                f'WITH (FORMAT csv, FORCE_NOT_NULL ({staging_columns}))',
+                file
+            )
+            count = cursor.rowcount
+            columns, values, params = staging_select(
+                model, header, staging, connection
+            )
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} '
+                f'({", ".join(columns)}) '
+                f'SELECT {", ".join(values)} FROM {staging} '
+                f'ON CONFLICT DO NOTHING',
+                params
+            )
+            cursor.execute(f'DROP TABLE {staging}')
+    return count
+
+
+def export_columns(name, model):
+    return [model._meta.get_field(column) for column in COLUMNS[name]]
+
+
+def export_file(path, name, model, using='default'):
+    """Выгружает таблицу в CSV, который понимает импорт."""
+    fields = export_columns(name, model)
+    queryset = model.objects.using(using).order_by('pk').values_list(
+        *(field.attname for field in fields)
+    )
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS[name])
+        for row in queryset.iterator():
+            writer.writerow(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+            count += 1
+    return count
+
+
+def copy_export_file(path, name, model, using='default'):
+    """Выгружает таблицу через COPY TO STDOUT (только PostgreSQL)."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        f'{quote(field.column)} AS {quote(column)}'
+        for field, column in zip(export_columns(name, model), COLUMNS[name])
+    )
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY (SELECT {columns} '
+                f'FROM {quote(model._meta.db_table)} ORDER BY 1) '
+                f'TO STDOUT WITH (FORMAT csv, HEADER true)',
+                file
+            )
+            return cursor.rowcount
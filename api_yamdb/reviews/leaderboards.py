@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from reviews.models import (Category, Genre, Title, TitleRanking,
+                            rating_sort_expression)
+
+GROUP_MODELS = {
+    TitleRanking.GENRE: Genre,
+    TitleRanking.CATEGORY: Category,
+}
+GROUP_FILTERS = {
+    TitleRanking.GENRE: 'genre',
+    TitleRanking.CATEGORY: 'category',
+}
+
+
+def rebuild_group(kind, group_id):
+    """Пересобирает топ одного жанра или категории."""
+    size = settings.LEADERBOARD_SIZE
+    with transaction.atomic():
+        # блокировка строки жанра/категории не даёт двум пересборкам
+        # одной таблицы столкнуться на уникальной позиции
+        group = GROUP_MODELS[kind].objects.select_for_update().filter(
+            pk=group_id
+        )
+        if not group.exists():
+            TitleRanking.objects.filter(kind=kind, group_id=group_id).delete()
+            return
+        titles = Title.objects.filter(
+            **{GROUP_FILTERS[kind]: group_id},
+            rating_count__gt=0
+        ).order_by(
+            rating_sort_expression().desc(),
+            F('rating_count').desc(),
+            'id'
+        ).values_list('id', 'rating_sum', 'rating_count')[:size]
+        TitleRanking.objects.filter(kind=kind, group_id=group_id).delete()
+        TitleRanking.objects.bulk_create(
+            TitleRanking(
+                kind=kind,
+                group_id=group_id,
+                position=position,
+                title_id=title_id,
+                rating=rating_sum / rating_count,
+                reviews_count=rating_count
+            )
+            for position, (title_id, rating_sum, rating_count) in enumerate(
+                titles, start=1
+            )
+        )
+
+
+def title_groups(title_id):
+    """Жанры и категория произведения плюс таблицы, где оно уже есть."""
+    groups = set(
+        TitleRanking.objects.filter(title_id=title_id).values_list(
+            'kind', 'group_id'
+        )
+    )
+    groups.update(
+        (TitleRanking.GENRE, genre_id)
+        for genre_id in Title.genre.through.objects.filter(
+            title_id=title_id
+        ).values_list('genre_id', flat=True)
+    )
+    category_id = Title.objects.filter(pk=title_id).values_list(
+        'category_id', flat=True
+    ).first()
+    if category_id is not None:
+        groups.add((TitleRanking.CATEGORY, category_id))
+    return groups
+
+
+def needs_rebuild(kind, group_id, title_id):
+    """Проверяет, может ли изменение произведения сдвинуть топ группы."""
+    entries = TitleRanking.objects.filter(kind=kind, group_id=group_id)
+    last = entries.order_by('-position').values_list(
+        'position', 'rating'
+    ).first()
+    if last is None or last[0] < settings.LEADERBOARD_SIZE:
+        return True
+    if entries.filter(title_id=title_id).exists():
+        return True
+    return Title.objects.filter(pk=title_id).with_rating().filter(
+        rating__gte=last[1]
+    ).exists()
+
+
+def refresh_title(title_id):
+    """Инкрементально обновляет топы, которых касается произведение."""
+    for kind, group_id in title_groups(title_id):
+        if needs_rebuild(kind, group_id, title_id):
+            rebuild_group(kind, group_id)
+
+
+def refresh_title_on_commit(title_id):
+    transaction.on_commit(lambda: refresh_title(title_id))
+
+
+def rebuild_groups_on_commit(groups):
+    def rebuild():
+        for kind, group_id in groups:
+            rebuild_group(kind, group_id)
+    transaction.on_commit(rebuild)
+
+
+def rebuild_all():
+    for kind, model in GROUP_MODELS.items():
+        for group_id in model.objects.values_list('pk', flat=True):
+            rebuild_group(kind, group_id)
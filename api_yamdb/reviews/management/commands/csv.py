@@ -1,92 +1,120 @@
-import csv
-import sqlite3
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from django.core.management.base import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title
-from user.models import User
+from django.db import connections
+from reviews.importing import (DATA_DIR, FILES, STAGES, Checkpoint,
+                               copy_export_file, copy_file, copy_supported,
+                               export_file, import_file, reset_sequences)
+from reviews.leaderboards import rebuild_all
+from reviews.models import Title
+
+from api.v1.cache import bump_version
 
 
 class Command(BaseCommand):
-    text = 'import data from cas file'
+    help = 'import data from csv files or export it back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--path', default=DATA_DIR)
+        parser.add_argument(
+            '--workers', type=int, default=3,
+            help='files of one stage are loaded in parallel threads; '
+                 'SQLite imports always run in one thread'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='json file with loaded offsets to resume an import'
+        )
+        parser.add_argument(
+            '--export', action='store_true',
+            help='write tables to csv files instead of reading them'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='use the ORM even on PostgreSQL'
+        )
 
     def handle(self, *args, **options):
-        with open('static/data/users.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                User.objects.get_or_create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
-                )
+        self.options = options
+        self.use_copy = copy_supported() and not options['no_copy']
+        self.checkpoint = Checkpoint(options['checkpoint'])
+        files = {name: (model, parse) for name, model, parse in FILES}
+        stages = (tuple(files),) if options['export'] else STAGES
+        for stage in stages:
+            self.run_stage(
+                [partial(self.load, name, *files[name]) for name in stage]
+            )
+        if not options['export']:
+            self.finish([model for _, model, _ in FILES])
+            self.checkpoint.clear()
 
-        with open('static/data/category.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                Category.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
+    def sequential(self):
+        connection = connections['default']
+        # внутри внешней транзакции потоки не увидели бы её данных;
+        # sqlite пускает одного писателя, и параллельные транзакции
+        # загрузки падали бы с database is locked
+        return (
+            self.options['workers'] < 2 or connection.in_atomic_block
+            or connection.vendor == 'sqlite' and not self.options['export']
+        )
 
-        with open('static/data/titles.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                category = Category.objects.get(id=row['category'])
-                Title.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=category,
-                )
+    def run_stage(self, tasks):
+        if len(tasks) < 2 or self.sequential():
+            for task in tasks:
+                task()
+            return
+        with ThreadPoolExecutor(self.options['workers']) as pool:
+            for future in [pool.submit(self.in_thread, t) for t in tasks]:
+                future.result()
 
-        with open('static/data/review.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                user = User.objects.get(id=row['author'])
-                Review.objects.get_or_create(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author=user,
-                    score=row['score'],
-                    pub_date=row['pub_date'],
-                )
+    @staticmethod
+    def in_thread(task):
+        """У каждого потока своё соединение, его надо закрыть."""
+        try:
+            return task()
+        finally:
+            connections.close_all()
 
-        with open('static/data/genre.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                Genre.objects.get_or_create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
+    def load(self, name, model, parse):
+        path = os.path.join(self.options['path'], name)
+        start = time.monotonic()
+        if self.options['export']:
+            count = (
+                copy_export_file(path, name, model) if self.use_copy
+                else export_file(path, name, model)
+            )
+        else:
+            count = self.import_file(path, name, model, parse)
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f'{name}: {count} rows in {elapsed:.2f}s, '
+            f'{count / elapsed if elapsed else count:.0f} rows/sec'
+            f'{" (copy)" if self.use_copy else ""}'
+        )
 
-        with open('static/data/genre_title.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            con = sqlite3.connect('db.sqlite3')
-            cur = con.cursor()
-            for row in reader:
-                cur.execute(
-                    '''
-                        INSERT INTO reviews_title_genre(id, title_id, genre_id)
-                        VALUES (?, ?, ?);
-                    ''',
-                    (row['id'], row['title_id'], row['genre_id'])
-                )
-                con.commit()
+    def import_file(self, path, name, model, parse):
+        offset = self.checkpoint.get(name)
+        if self.use_copy:
+            count = copy_file(path, model, offset=offset)
+            self.checkpoint.save(name, os.path.getsize(path))
+            return count
+        return import_file(
+            path, model, parse, self.options['batch_size'], offset=offset,
+            checkpoint=(
+                partial(self.checkpoint.save, name) if self.checkpoint
+                else None
+            )
+        )
 
-        with open('static/data/comments.csv', encoding='utf-8') as File:
-            reader = csv.DictReader(File)
-            for row in reader:
-                user = User.objects.get(id=row['author'])
-                Comment.objects.get_or_create(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author=user,
-                    pub_date=row['pub_date']
-                )
+    def finish(self, models):
+        """Действия, которые bulk_create пропускает вместе с сигналами."""
+        reset_sequences(models)
+        Title.objects.recalculate_ratings()
+        rebuild_all()
+        for model in models:
+            bump_version(model._meta.model_name)
+        self.stdout.write('ratings, leaderboards and caches are updated')
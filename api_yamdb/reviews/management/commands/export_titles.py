@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from reviews.exports import CHUNK_SIZE, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'stream titles with rating, genres and category as ndjson or csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=FORMATS, default='ndjson')
+        parser.add_argument('--reviews', action='store_true')
+        parser.add_argument('--comments', action='store_true')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--file', help='write to a file, not stdout')
+
+    def handle(self, *args, **options):
+        lines = export_lines(
+            options['output'], options['reviews'], options['comments'],
+            options['chunk_size']
+        )
+        if not options['file']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['file'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.generation import Generator, confirm_target
+from reviews.importing import reset_sequences
+from reviews.leaderboards import rebuild_all
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+from api.v1.cache import bump_version
+
+MODELS = (User, Category, Genre, Title, Title.genre.through, Review, Comment)
+
+
+class Command(BaseCommand):
+    help = (
+        'append a synthetic catalogue of about --scale rows '
+        '(users, categories, genres, titles, reviews, comments)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=int, default=10_000,
+            help='total rows, from 10 000 to 10 000 000'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--yes', action='store_true',
+            help='confirm writing to the configured database'
+        )
+
+    def handle(self, *args, **options):
+        confirm_target(options['yes'])
+        generator = Generator(
+            options['scale'], options['batch_size'], options['seed']
+        )
+        start = time.monotonic()
+        total = 0
+        for created in generator.run():
+            total += created
+            self.stdout.write(f'{total} rows')
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f'{total} rows in {elapsed:.1f} s, '
+            f'{total / max(elapsed, 1e-6):.0f} rows/s'
+        )
+        # bulk_create не отправляет сигналы
+        reset_sequences(MODELS)
+        rebuild_all()
+        for model in MODELS:
+            bump_version(model._meta.model_name)
+        self.stdout.write('leaderboards and caches are updated')
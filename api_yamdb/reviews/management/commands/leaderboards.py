@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'rebuild precomputed genre and category leaderboards'
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        rebuild_all()
+        self.stdout.write(
+            f'leaderboards rebuilt in {time.monotonic() - start:.2f}s'
+        )
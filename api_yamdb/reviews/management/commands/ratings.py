@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'check and recalculate stored title ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='only report titles with stale rating, do not fix them'
+        )
+
+    def handle(self, *args, **options):
+        stale = Title.objects.with_actual_rating().filter(
+            ~Q(rating_sum=F('actual_sum')) | ~Q(rating_count=F('actual_count'))
+        )
+        rows = stale.values_list(
+            'id', 'rating_sum', 'rating_count', 'actual_sum', 'actual_count'
+        )
+        for row in rows:
+            self.stdout.write(
+                'title {}: stored {}/{}, actual {}/{}'.format(*row)
+            )
+        if options['check']:
+            if rows:
+                raise CommandError(f'{len(rows)} titles have stale rating')
+            self.stdout.write('all ratings are up to date')
+            return
+        updated = Title.objects.filter(
+            pk__in=stale.values('pk')
+        ).recalculate_ratings()
+        self.stdout.write(f'recalculated {updated} titles')
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.17 on 2026-10-18 13:30
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    GinIndex(
+        SearchVector('name', 'description', config='simple'),
+        name='title_search_idx'
+    ),
+    GinIndex(
+        fields=['name'],
+        opclasses=['gin_trgm_ops'],
+        name='title_name_trgm_idx'
+    ),
+)
+
+
+def add_search_indexes(apps, schema_editor):
+    # GIN-индексы есть только в PostgreSQL, на sqlite поиск идёт по icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Title = apps.get_model('reviews', 'Title')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Title, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Title = apps.get_model('reviews', 'Title')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Title, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_updated_at'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.17 on 2026-10-18 14:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('genre', 'genre'), ('category', 'category')], max_length=16, verbose_name='kind')),
+                ('group_id', models.PositiveBigIntegerField(verbose_name='genre or category id')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='position')),
+                ('rating', models.FloatField(verbose_name='rating')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='reviews count')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title')),
+            ],
+            options={
+                'ordering': ('kind', 'group_id', 'position'),
+                'default_related_name': 'rankings',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('kind', 'group_id', 'position'), name='unique_ranking_position'),
+        ),
+    ]
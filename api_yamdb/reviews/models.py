@@ -1,9 +1,106 @@
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (Count, F, FloatField, OuterRef, Q, Subquery,
+                              Sum)
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+from django.utils import timezone
 from django.core.validators import RegexValidator
 from reviews.validators import year_validate
 from user.models import User
 
+SEARCH_CONFIG = 'simple'
+
+
+class TitleQuerySet(models.QuerySet):
+    def with_rating(self):
+        """Добавляет средний рейтинг из сохранённых суммы и числа оценок."""
+        return self.annotate(rating=rating_expression())
+
+    def search(self, text):
+        """Ранжированный полнотекстовый и нечёткий поиск по произведениям.
+
+        На PostgreSQL используются GIN-индексы по tsvector от name и
+        description и по триграммам name (миграция 0006). На остальных
+        базах, например sqlite в тестах, поиск упрощается до icontains
+        по тем же полям без ранжирования.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        vector = search_vector()
+        query = SearchQuery(text, config=SEARCH_CONFIG,
+                            search_type='websearch')
+        return self.annotate(
+            search=vector,
+            search_rank=SearchRank(vector, query),
+            similarity=TrigramSimilarity('name', text)
+        ).filter(
+            Q(search=query) | Q(name__trigram_similar=text)
+        ).order_by('-search_rank', '-similarity', 'name', 'id')
+
+    def shift_rating(self, score, count):
+        """Сдвигает сохранённые сумму и число оценок одним UPDATE."""
+        return self.update(
+            rating_sum=F('rating_sum') + score,
+            rating_count=F('rating_count') + count,
+            updated_at=timezone.now()
+        )
+
+    def with_actual_rating(self):
+        """Добавляет сумму и число оценок, посчитанные по отзывам."""
+        actual_sum, actual_count = review_totals()
+        return self.annotate(
+            actual_sum=actual_sum,
+            actual_count=actual_count
+        )
+
+    def recalculate_ratings(self):
+        """Пересчитывает сохранённый рейтинг по таблице отзывов."""
+        rating_sum, rating_count = review_totals()
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            updated_at=timezone.now()
+        )
+
+
+def search_vector():
+    return SearchVector('name', 'description', config=SEARCH_CONFIG)
+
+
+def rating_expression():
+    return Cast('rating_sum', FloatField()) / NullIf('rating_count', 0)
+
+
+def rating_sort_expression():
+    """Рейтинг для сортировки: без NULL, произведения без оценок — 0.
+
+    Совпадает с выражением индекса title_rating_idx, иначе индекс
+    не будет использован для ORDER BY.
+    """
+    return Cast('rating_sum', FloatField()) / Greatest('rating_count', 1)
+
+
+def review_totals():
+    """Подзапросы суммы и числа оценок отзывов на произведение."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return (
+        Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0
+        ),
+    )
+
 
 class Title(models.Model):
     name = models.CharField(
@@ -29,10 +126,38 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='rating sum',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='rating count',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='updated at',
+        auto_now=True
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'title'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(
+                fields=('rating_count', 'id'),
+                name='title_rating_count_idx'
+            ),
+            models.Index(
+                rating_sort_expression(), F('id'),
+                name='title_rating_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -90,6 +215,10 @@ class Review(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='updated at',
+        auto_now=True
+    )
     text = models.TextField()
     score = models.IntegerField(
         verbose_name='score',
@@ -104,6 +233,27 @@ class Review(models.Model):
         default_related_name = 'reviews'
         ordering = ('-pub_date',)
         unique_together = ('title', 'author')
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # рейтинг произведения обновляется в post_save,
+        # поэтому запись отзыва и счётчиков идёт одной транзакцией
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -120,11 +270,63 @@ class Comment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='updated at',
+        auto_now=True
+    )
     text = models.TextField()
 
     class Meta:
         default_related_name = 'comments'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.author
+
+
+class TitleRanking(models.Model):
+    """Предрасчитанная позиция произведения в топе жанра или категории."""
+
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    KIND_CHOICES = (
+        (GENRE, 'genre'),
+        (CATEGORY, 'category'),
+    )
+    kind = models.CharField(
+        verbose_name='kind',
+        max_length=16,
+        choices=KIND_CHOICES
+    )
+    group_id = models.PositiveBigIntegerField(
+        verbose_name='genre or category id'
+    )
+    position = models.PositiveSmallIntegerField(
+        verbose_name='position'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE
+    )
+    rating = models.FloatField(
+        verbose_name='rating'
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='reviews count'
+    )
+
+    class Meta:
+        default_related_name = 'rankings'
+        ordering = ('kind', 'group_id', 'position')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('kind', 'group_id', 'position'),
+                name='unique_ranking_position'
+            ),
+        )
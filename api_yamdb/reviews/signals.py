@@ -0,0 +1,76 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.leaderboards import (rebuild_groups_on_commit,
+                                  refresh_title_on_commit, title_groups)
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    title_id, score = getattr(instance, '_loaded_rating', (None, None))
+    instance._loaded_rating = (instance.title_id, instance.score)
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1
+        )
+    elif title_id is None:
+        # прежняя оценка неизвестна, пересчитываем по отзывам
+        Title.objects.filter(pk=instance.title_id).recalculate_ratings()
+    elif title_id != instance.title_id:
+        Title.objects.filter(pk=title_id).shift_rating(-score, -1)
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1
+        )
+        refresh_title_on_commit(title_id)
+    elif score != instance.score:
+        Title.objects.filter(pk=title_id).shift_rating(
+            instance.score - score, 0
+        )
+    else:
+        # правка текста рейтинга и топов не меняет
+        return
+    refresh_title_on_commit(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).shift_rating(
+        -instance.score, -1
+    )
+    refresh_title_on_commit(instance.title_id)
+
+
+@receiver(post_save, sender=Title)
+def update_leaderboards_on_title_save(sender, instance, raw, **kwargs):
+    if not raw:
+        refresh_title_on_commit(instance.pk)
+
+
+@receiver(pre_delete, sender=Title)
+def update_leaderboards_on_title_delete(sender, instance, **kwargs):
+    groups = title_groups(instance.pk)
+    if groups:
+        rebuild_groups_on_commit(groups)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_leaderboards_on_genre_change(sender, instance, action, reverse,
+                                        pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        refresh_title_on_commit(instance.pk)
+    else:
+        rebuild_groups_on_commit([(TitleRanking.GENRE, instance.pk)])
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def delete_leaderboard(sender, instance, **kwargs):
+    kind = (
+        TitleRanking.GENRE if sender is Genre else TitleRanking.CATEGORY
+    )
+    TitleRanking.objects.filter(kind=kind, group_id=instance.pk).delete()
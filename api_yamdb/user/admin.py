@@ -1,5 +1,5 @@
 from django.contrib import admin
-from user.models import User
+from user.models import OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -15,4 +15,19 @@ class UserAdmin(admin.ModelAdmin):
     empty_value_display = 'пусто'
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'created_at',
+        'attempts',
+        'next_attempt_at',
+        'sent_at'
+    )
+    search_fields = ('recipient',)
+    list_filter = ('sent_at',)
+    empty_value_display = 'пусто'
+
+
 admin.site.register(User, UserAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
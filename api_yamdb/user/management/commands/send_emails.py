@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from user.models import OutboxEmail
+
+
+def backoff(attempts):
+    """Задержка перед повтором: растёт вдвое, но не больше потолка."""
+    return min(
+        settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF
+    )
+
+
+class Command(BaseCommand):
+    help = 'send queued emails in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='send one batch and exit'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = self.send_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            if options['once']:
+                return
+            if not sent:
+                time.sleep(options['interval'])
+
+    def send_batch(self, batch_size, max_attempts):
+        batch = self.claim(batch_size, max_attempts)
+        if not batch:
+            return 0
+        # SMTP идёт вне транзакции: строки очереди не заблокированы и
+        # регистрация не ждёт отправку
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            for email in batch:
+                self.fail(email, error)
+        else:
+            try:
+                for email in batch:
+                    self.send(connection, email)
+            finally:
+                connection.close()
+        for email in batch:
+            self.save(email)
+        sent = sum(email.sent_at is not None for email in batch)
+        self.stdout.write(f'sent {sent} of {len(batch)} emails')
+        return len(batch)
+
+    def claim(self, batch_size, max_attempts):
+        """Забирает пачку, сдвигая следующую попытку на время аренды.
+
+        Если воркер упадёт посреди отправки, письма снова станут доступны
+        после окончания аренды.
+        """
+        lease = timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        with transaction.atomic():
+            # skip_locked позволяет запускать несколько воркеров
+            batch = list(
+                OutboxEmail.objects.due(max_attempts).select_for_update(
+                    skip_locked=True
+                )[:batch_size]
+            )
+            OutboxEmail.objects.filter(
+                pk__in=[email.pk for email in batch]
+            ).update(next_attempt_at=lease)
+        for email in batch:
+            email.next_attempt_at = email.leased_until = lease
+        return batch
+
+    def save(self, email):
+        # повторная регистрация за время отправки заменила письмо и
+        # сбросила next_attempt_at: новый код ещё не отправлен
+        OutboxEmail.objects.filter(
+            pk=email.pk, sent_at__isnull=True,
+            next_attempt_at=email.leased_until
+        ).update(
+            attempts=email.attempts,
+            next_attempt_at=email.next_attempt_at,
+            sent_at=email.sent_at,
+            last_error=email.last_error
+        )
+
+    def send(self, connection, email):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=settings.ADMIN_EMAIL,
+            to=[email.recipient],
+            connection=connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            self.fail(email, error)
+            return
+        email.sent_at = timezone.now()
+
+    def fail(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error)
+        email.next_attempt_at = timezone.now() + timedelta(
+            seconds=backoff(email.attempts)
+        )
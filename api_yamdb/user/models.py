@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
 from .validators import validate_username
 
@@ -54,3 +55,99 @@ class User(AbstractUser):
     @property
     def is_user(self):
         return self.role == 'user'
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    def enqueue(self, user, subject, body):
+        """Ставит письмо в очередь, заменяя ещё не отправленное письмо
+        пользователю, чтобы повторные коды не копились в очереди."""
+        defaults = {
+            'recipient': user.email,
+            'subject': subject,
+            'body': body,
+            'attempts': 0,
+            'next_attempt_at': timezone.now(),
+            'last_error': '',
+        }
+        try:
+            with transaction.atomic():
+                email, _ = self.update_or_create(
+                    user=user, sent_at=None, defaults=defaults
+                )
+        except IntegrityError:
+            # параллельный запрос успел создать письмо для того же
+            # пользователя, теперь оно найдётся и обновится
+            email, _ = self.update_or_create(
+                user=user, sent_at=None, defaults=defaults
+            )
+        return email
+
+    def due(self, max_attempts):
+        return self.filter(
+            sent_at__isnull=True,
+            next_attempt_at__lte=timezone.now(),
+            attempts__lt=max_attempts
+        ).order_by('next_attempt_at')
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки воркером send_emails."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE
+    )
+    recipient = models.EmailField(
+        verbose_name='recipient',
+        max_length=254
+    )
+    subject = models.CharField(
+        verbose_name='subject',
+        max_length=255
+    )
+    body = models.TextField(
+        verbose_name='body'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='created at',
+        auto_now_add=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='attempts',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='next attempt at',
+        default=timezone.now
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='sent at',
+        blank=True,
+        null=True
+    )
+    last_error = models.TextField(
+        verbose_name='last error',
+        blank=True
+    )
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        default_related_name = 'outbox_emails'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user',),
+                condition=models.Q(sent_at__isnull=True),
+                name='unique_pending_email'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at',),
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_due_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
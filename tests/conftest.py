@@ -1,9 +1,24 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+from django.core.cache import cache
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.query_budget',
+    'tests.query_plans',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.v1.authentication import user_cache
+    from api.v1.catalog import clear_catalogs
+    cache.clear()
+    user_cache.clear()
+    # справочники процесса держат объекты из откаченных транзакций тестов
+    clear_catalogs()
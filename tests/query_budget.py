@@ -0,0 +1,88 @@
+"""Плагин pytest: бюджет запросов к базе и поиск N+1.
+
+Фикстура query_budget возвращает контекстный менеджер, который
+падает, если запросов больше бюджета или один и тот же запрос (с
+точностью до значений параметров) повторился N_PLUS_ONE раз и больше.
+Итоги всех проверок печатаются в конце прогона.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+N_PLUS_ONE = 3
+
+_LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+# служебные запросы транзакций повторяются законно
+_IGNORED = re.compile(r'^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)')
+
+_report = []
+
+
+def normalize(sql):
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def repeated_queries(queries, threshold=N_PLUS_ONE):
+    counts = Counter(
+        normalize(query['sql']) for query in queries
+        if not _IGNORED.match(query['sql'])
+    )
+    return {sql: number for sql, number in counts.items()
+            if number >= threshold}
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+@contextmanager
+def assert_query_budget(budget, label='', threshold=N_PLUS_ONE):
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    queries = context.captured_queries
+    _report.append((label, len(queries), budget))
+    repeated = repeated_queries(queries, threshold)
+    if repeated:
+        pytest.fail(
+            f'{label}: похоже на N+1, запросы повторяются:\n'
+            + '\n'.join(f'{number} x {sql}'
+                        for sql, number in repeated.items())
+            + f'\n\nВсе запросы:\n{format_queries(queries)}',
+            pytrace=False
+        )
+    if len(queries) > budget:
+        pytest.fail(
+            f'{label}: {len(queries)} запросов при бюджете {budget}:\n'
+            f'{format_queries(queries)}',
+            pytrace=False
+        )
+
+
+@pytest.fixture
+def query_budget(db):
+    return assert_query_budget
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _report:
+        return
+    terminalreporter.section('query budgets')
+    for label, used, budget in sorted(_report):
+        marker = '!' if used > budget else ' '
+        terminalreporter.write_line(
+            f'{marker} {used:>3} / {budget:<3} {label}'
+        )
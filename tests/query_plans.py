@@ -0,0 +1,153 @@
+"""Плагин pytest: снимки планов запросов.
+
+Фикстура query_plans возвращает контекстный менеджер, который прогоняет
+через EXPLAIN все SELECT внутри блока и сравнивает способ чтения каждой
+таблицы со снимком в tests/plans/<база>.json. Проверка падает, если
+таблица, которую снимок читал по индексу, стала читаться полным
+проходом. pytest --update-plans перезаписывает снимки; снимок
+PostgreSQL снимается и проверяется джобом tests-postgres в CI.
+"""
+import json
+import os
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PLANS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plans')
+SEQ = 'seq'
+
+EXPLAIN = {
+    'postgresql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+_SQLITE_SCAN = re.compile(r'\b(?:SCAN|SEARCH) (?:TABLE )?(\w+)(.*)$')
+_SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+# Bitmap Index Scan не разбирается: таблицу называет его Bitmap Heap Scan
+_POSTGRES_SCAN = re.compile(
+    r'\s*(?:->\s+)?(?:Parallel )?'
+    r'(Seq Scan|Index Scan|Index Only Scan|Bitmap Heap Scan)'
+    r'(?: Backward)?(?: using (\S+))? on (\S+)'
+)
+
+_updated = defaultdict(dict)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-plans', action='store_true',
+        help='перезаписать снимки планов запросов в tests/plans'
+    )
+
+
+def sqlite_scan(line):
+    match = _SQLITE_SCAN.search(line)
+    if match is None:
+        return None
+    table, rest = match.groups()
+    if 'PRIMARY KEY' in rest:
+        return table, 'pk'
+    index = _SQLITE_INDEX.search(rest)
+    # AUTOMATIC INDEX sqlite строит на лету вместо настоящего индекса
+    if index is None or 'AUTOMATIC' in rest:
+        return table, SEQ
+    return table, index.group(1)
+
+
+def postgres_scan(line):
+    match = _POSTGRES_SCAN.match(line)
+    if match is None:
+        return None
+    kind, index, table = match.groups()
+    if kind == 'Seq Scan':
+        return table, SEQ
+    return table, index or 'bitmap'
+
+
+def scans(plan_lines, vendor):
+    parse = postgres_scan if vendor == 'postgresql' else sqlite_scan
+    return [scan for scan in map(parse, plan_lines) if scan is not None]
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(EXPLAIN[connection.vendor] + sql)
+        return [' '.join(str(value) for value in row)
+                for row in cursor.fetchall()]
+
+
+def plan_snapshot(queries):
+    """Способы чтения каждой таблицы во всех SELECT блока."""
+    tables = defaultdict(set)
+    for query in queries:
+        if not query['sql'].startswith('SELECT'):
+            continue
+        for table, access in scans(explain(query['sql']), connection.vendor):
+            tables[table].add(access)
+    return {table: sorted(access) for table, access in sorted(tables.items())}
+
+
+def regressions(before, after):
+    """Таблицы, которые читались только по индексам, а теперь нет."""
+    return [
+        f'{table}: {", ".join(before[table])} -> {", ".join(access)}'
+        for table, access in after.items()
+        if SEQ in access and before.get(table) and SEQ not in before[table]
+    ]
+
+
+def snapshot_path(vendor):
+    return os.path.join(PLANS_DIR, f'{vendor}.json')
+
+
+def load_snapshots(vendor):
+    with open(snapshot_path(vendor), encoding='utf-8') as file:
+        return json.load(file)
+
+
+@contextmanager
+def check_plans(label, update=False):
+    vendor = connection.vendor
+    if vendor not in EXPLAIN:
+        pytest.skip(f'EXPLAIN для {vendor} не разбирается')
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    snapshot = plan_snapshot(context.captured_queries)
+    if update:
+        _updated[vendor][label] = snapshot
+        return
+    if not os.path.exists(snapshot_path(vendor)):
+        pytest.skip(f'нет снимка планов для {vendor}, --update-plans')
+    saved = load_snapshots(vendor).get(label)
+    if saved is None:
+        pytest.fail(
+            f'{label}: нет снимка плана, запустите pytest --update-plans',
+            pytrace=False
+        )
+    broken = regressions(saved, snapshot)
+    if broken:
+        pytest.fail(
+            f'{label}: индекс сменился полным проходом таблицы:\n'
+            + '\n'.join(broken),
+            pytrace=False
+        )
+
+
+@pytest.fixture
+def query_plans(db, request):
+    update = request.config.getoption('update_plans')
+    return lambda label: check_plans(label, update)
+
+
+def pytest_sessionfinish(session):
+    for vendor, plans in _updated.items():
+        path = snapshot_path(vendor)
+        saved = load_snapshots(vendor) if os.path.exists(path) else {}
+        saved.update(plans)
+        os.makedirs(PLANS_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(saved, file, indent=2, sort_keys=True)
+            file.write('\n')
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+from asgiref.sync import SyncToAsync, async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, RequestFactory
+from rest_framework.test import APIClient
+
+from api.v1.async_views import async_urls
+from api.v1.metrics import registry
+from api.v1.urls import router
+from api.v1.views import TitleViewSet
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+VIEWS = {url.name: url.callback for url in async_urls(router.urls)
+         if url.name}
+
+
+@pytest.fixture
+def catalogue():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    author = User.objects.create(username='author', email='a@ya.ru')
+    title = Title.objects.create(name='Title', year=2000, category=category)
+    title.genre.add(genre)
+    review = Review.objects.create(title=title, author=author, text='text',
+                                   score=5)
+    Comment.objects.create(review=review, author=author, text='comment')
+    return title, review
+
+
+def call(name, method='get', path='/', **kwargs):
+    request = getattr(RequestFactory(), method)(path)
+    response = async_to_sync(VIEWS[name])(request, **kwargs)
+    return response.status_code, json.loads(response.content)
+
+
+# представления ходят в базу из других потоков и не видят транзакцию теста
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    def test_views_are_async(self):
+        for name in ('titles-list', 'titles-detail', 'reviews-list',
+                     'comments-list'):
+            assert asyncio.iscoroutinefunction(VIEWS[name]), name
+        assert not asyncio.iscoroutinefunction(VIEWS['genres-list'])
+
+    def test_same_responses(self, catalogue):
+        title, review = catalogue
+        client = APIClient()
+        cases = (
+            ('titles-list', '/api/v1/titles/', {}),
+            ('titles-detail', f'/api/v1/titles/{title.id}/',
+             {'pk': str(title.id)}),
+            ('reviews-list', f'/api/v1/titles/{title.id}/reviews/',
+             {'title_id': str(title.id)}),
+            ('comments-list',
+             f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+             {'title_id': str(title.id), 'review_id': str(review.id)}),
+        )
+        for name, path, kwargs in cases:
+            expected = client.get(path)
+            assert call(name, path=path, **kwargs) == (
+                expected.status_code, expected.json()
+            ), f'Проверьте, что ответ {name} совпадает с синхронным'
+
+    def test_writes_stay_in_shared_thread(self, catalogue, monkeypatch):
+        threads = {}
+        initial = TitleViewSet.initial
+
+        def record(view, request, *args, **kwargs):
+            threads[request.method] = threading.get_ident()
+            return initial(view, request, *args, **kwargs)
+
+        monkeypatch.setattr(TitleViewSet, 'initial', record)
+        title, _ = catalogue
+        for method in ('get', 'patch'):
+            call('titles-detail', method=method, pk=str(title.id))
+        assert threads['PATCH'] == threading.get_ident(), (
+            'Проверьте, что записи не уходят в поток из пула'
+        )
+        assert threads['GET'] != threading.get_ident()
+
+    def test_same_permissions(self, catalogue):
+        status_code, _ = call('titles-list', method='post')
+        assert status_code == 401
+
+
+def test_asgi_chain_is_not_adapted(caplog):
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        handler = ASGIHandler()
+    adapted = [record.getMessage() for record in caplog.records
+               if 'adapted' in record.getMessage()]
+    assert adapted == [], (
+        'Проверьте, что под ASGI middleware не переводится в поток'
+    )
+    assert not isinstance(handler._middleware_chain, SyncToAsync)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_request_is_measured(settings, tmp_path, catalogue):
+    settings.METRICS_DIR = str(tmp_path)
+    registry.reset()
+    response = async_to_sync(AsyncClient().get)('/api/v1/titles/')
+    assert response.status_code == 200
+    series = registry.series['titles-list GET']
+    assert series['count'] == 1
+    assert series['db_queries'] > 0, (
+        'Проверьте, что под ASGI запросы к базе попадают в метрики'
+    )
@@ -0,0 +1,69 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def review_thread():
+    title = Title.objects.create(name='Title', year=2000)
+    authors = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@ya.ru')
+        for i in range(5)
+    ]
+    reviews = [
+        Review.objects.create(title=title, author=author, text='text',
+                              score=5)
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(review=reviews[0], author=author,
+                               text='comment')
+    return title, reviews, authors
+
+
+@pytest.mark.django_db
+class TestAuthorQueries:
+
+    def test_review_list(self, review_thread, django_assert_num_queries):
+        title, _, authors = review_thread
+        # произведение, COUNT, отзывы с авторами
+        with django_assert_num_queries(3):
+            response = APIClient().get(f'/api/v1/titles/{title.id}/reviews/')
+        assert {review['author'] for review in response.json()['results']} \
+            == {author.username for author in authors}
+
+    def test_comment_list(self, review_thread, django_assert_num_queries):
+        title, reviews, authors = review_thread
+        # отзыв, COUNT, комментарии с авторами
+        with django_assert_num_queries(3):
+            response = APIClient().get(
+                f'/api/v1/titles/{title.id}/reviews/{reviews[0].id}/comments/'
+            )
+        assert len(response.json()['results']) == len(authors)
+
+    def test_review_update_by_author(self, review_thread,
+                                     django_assert_num_queries):
+        title, reviews, authors = review_thread
+        client = APIClient()
+        client.force_authenticate(authors[0])
+        # произведение, отзыв с автором, UPDATE отзыва, пересчёт рейтинга
+        # и точки сохранения транзакции
+        with django_assert_num_queries(6):
+            response = client.patch(
+                f'/api/v1/titles/{title.id}/reviews/{reviews[0].id}/',
+                {'score': 9}
+            )
+        assert response.status_code == 200
+        assert response.json()['author'] == authors[0].username
+
+    def test_foreign_review_update_is_forbidden(self, review_thread):
+        title, reviews, authors = review_thread
+        client = APIClient()
+        client.force_authenticate(authors[1])
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{reviews[0].id}/',
+            {'score': 9}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import F
+
+from reviews.generation import plan
+from reviews.models import Comment, Review, Title
+from user.models import User
+
+SCALE = 3000
+
+
+@pytest.fixture
+def catalogue(db):
+    call_command('generate_catalogue', scale=SCALE, batch_size=50,
+                 yes=True)
+
+
+@pytest.mark.django_db
+class TestGenerateCatalogue:
+
+    def test_counts_follow_scale(self, catalogue):
+        counts = plan(SCALE)
+        assert User.objects.count() == counts['users'], (
+            'Пользователей должно быть столько, сколько задаёт масштаб'
+        )
+        assert Title.objects.count() == counts['titles'], (
+            'Произведений должно быть столько, сколько задаёт масштаб'
+        )
+        for model, key in ((Review, 'reviews'), (Comment, 'comments')):
+            assert 0.5 * counts[key] < model.objects.count() < 1.5 * counts[key], (
+                f'Число строк {model.__name__} должно быть близко к плану'
+            )
+
+    def test_reviews_are_valid(self, catalogue):
+        assert not Review.objects.exclude(
+            score__gte=1, score__lte=10
+        ).exists(), 'Оценки должны быть от 1 до 10'
+        assert len(set(Review.objects.values_list('score', flat=True))) > 5, (
+            'Оценки должны быть распределены, а не одинаковы'
+        )
+        assert not Title.objects.with_actual_rating().exclude(
+            rating_sum=F('actual_sum'), rating_count=F('actual_count')
+        ).exists(), 'Сохранённый рейтинг должен совпадать с отзывами'
+
+    def test_appends_to_existing_data(self, catalogue):
+        call_command('generate_catalogue', scale=SCALE, seed=1, yes=True)
+        assert Title.objects.count() == 2 * plan(SCALE)['titles'], (
+            'Повторный запуск должен дописывать каталог'
+        )
+        last = User.objects.order_by('pk').last().pk
+        user = User.objects.create(username='after', email='after@ya.ru')
+        assert user.pk > last, (
+            'Счётчики id должны быть сдвинуты после вставки явных id'
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('command, options', (
+    ('generate_catalogue', {'scale': SCALE}),
+    ('bench_title_search', {'titles': 10, 'repeat': 1}),
+    ('bench_endpoints', {'repeat': 1}),
+))
+def test_writes_need_confirmation(command, options):
+    with pytest.raises(CommandError, match='--yes'):
+        call_command(command, **options)
+    assert not Title.objects.exists() and not User.objects.exists(), (
+        'Проверьте, что без --yes команда ничего не пишет в базу'
+    )
+
+
+@pytest.mark.django_db
+def test_bench_endpoints_report(catalogue, tmp_path):
+    users = User.objects.count()
+    output = tmp_path / 'report.json'
+    call_command('bench_endpoints', repeat=3, warmup=1, output=str(output),
+                 yes=True)
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert set(report['endpoints']) == {
+        'titles-list', 'titles-list-filtered', 'titles-detail',
+        'reviews-list', 'comments-list', 'signup', 'token'
+    }, 'В отчёте должны быть все горячие эндпоинты'
+    for label, result in report['endpoints'].items():
+        assert result['statuses'] == [200], f'{label} должен отвечать 200'
+        assert result['p50_ms'] <= result['p95_ms'], (
+            f'{label}: p50 не может быть больше p95'
+        )
+        assert result['queries'] > 0, (
+            f'{label}: без кэша ответ должен читать базу'
+        )
+    assert User.objects.count() == users, (
+        'Пользователи, созданные замером, должны быть удалены'
+    )
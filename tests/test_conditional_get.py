@@ -0,0 +1,103 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def review():
+    title = Title.objects.create(name='Title', year=2000)
+    author = User.objects.create(username='author', email='author@ya.ru')
+    return Review.objects.create(title=title, author=author, text='text',
+                                 score=5)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_detail_not_modified(self, review, django_assert_num_queries):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert response['Last-Modified']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+        assert not response.content
+
+    def test_detail_changes_with_rating(self, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/'
+        etag = client.get(url)['ETag']
+        review.score = 9
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение рейтинга меняет ETag произведения'
+        )
+        assert response.json()['rating'] == 9.0
+
+    def test_list_not_modified_without_queries(
+        self, review, django_assert_num_queries
+    ):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        etag = client.get('/api/v1/genres/')['ETag']
+        with django_assert_num_queries(0):
+            response = APIClient().get('/api/v1/genres/',
+                                       HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_list_changes_after_new_review(self, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        author = User.objects.create(username='other', email='other@ya.ru')
+        Review.objects.create(title=review.title, author=author, text='new',
+                              score=1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+    @pytest.mark.parametrize('parent', ('title', 'review'))
+    def test_deleted_empty_parent_is_not_modified_404(self, review, parent):
+        client = APIClient()
+        if parent == 'title':
+            empty = Title.objects.create(name='Empty', year=2000)
+            url = f'/api/v1/titles/{empty.id}/reviews/'
+        else:
+            empty = review
+            url = (f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+                   f'comments/')
+        etag = client.get(url)['ETag']
+        empty.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404, (
+            'Проверьте, что список удалённого родителя отдаёт 404, а не 304'
+        )
+
+    def test_profile_edit_keeps_list_etag(self, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        author = review.author
+        author.bio = 'новое о себе'
+        author.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что правка профиля не сбрасывает ETag отзывов'
+        )
+        author.username = 'renamed'
+        author.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что смена имени автора меняет ETag отзывов'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
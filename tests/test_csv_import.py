@@ -0,0 +1,201 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.importing import copy_supported
+from reviews.management.commands import csv as csv_command
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+DATA = {
+    'users.csv': (
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        [(i, f'user{i}', f'user{i}@ya.ru', 'user', '', '', '')
+         for i in range(1, 6)],
+    ),
+    'category.csv': (
+        ('id', 'name', 'slug'),
+        [(1, 'Фильм', 'movie'), (2, 'Книга', 'book')],
+    ),
+    'genre.csv': (
+        ('id', 'name', 'slug'),
+        [(1, 'Драма', 'drama'), (2, 'Комедия', 'comedy')],
+    ),
+    'titles.csv': (
+        ('id', 'name', 'year', 'category', 'description'),
+        [(i, f'Title {i}', 2000 + i, i % 2 + 1,
+          f'Описание, "в кавычках"\n{i}' if i % 3 else '')
+         for i in range(1, 8)],
+    ),
+    'review.csv': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        [(i, i % 7 + 1, f'review {i}', i % 5 + 1, i % 10 + 1,
+          '2019-09-24T21:08:21.567Z') for i in range(1, 21)],
+    ),
+    'genre_title.csv': (
+        ('id', 'title_id', 'genre_id'),
+        [(i, i, i % 2 + 1) for i in range(1, 8)],
+    ),
+    'comments.csv': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        [(i, i, f'comment {i}', 1, '2019-09-25T12:00:00Z')
+         for i in range(1, 11)],
+    ),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, (header, rows) in DATA.items():
+        with open(tmp_path / name, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return tmp_path
+
+
+def snapshot():
+    return {
+        'users': User.objects.count(),
+        'categories': Category.objects.count(),
+        'genres': Genre.objects.count(),
+        'titles': sorted(Title.objects.values_list(
+            'id', 'name', 'year', 'description', 'category_id',
+            'rating_sum', 'rating_count')),
+        'genre_links': sorted(Title.genre.through.objects.values_list(
+            'title_id', 'genre_id')),
+        'reviews': sorted(Review.objects.values_list(
+            'id', 'title_id', 'author_id', 'score', 'pub_date')),
+        'comments': sorted(Comment.objects.values_list(
+            'id', 'review_id', 'pub_date')),
+    }
+
+
+def clear():
+    for model in (Comment, Review, Title, Genre, Category, User):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db
+class TestCsvImport:
+
+    def test_import(self, data_dir, capsys):
+        call_command('csv', '--path', str(data_dir), '--batch-size', '3')
+        data = snapshot()
+        assert data['users'] == 5
+        assert len(data['reviews']) == 20
+        assert len(data['comments']) == 10
+        assert len(data['genre_links']) == 7
+        assert data['reviews'][0][4].isoformat().startswith('2019-09-24'), (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        title = Title.objects.get(pk=1)
+        scores = Review.objects.filter(title=title).values_list(
+            'score', flat=True)
+        assert (title.rating_sum, title.rating_count) == (
+            sum(scores), len(scores)
+        ), 'Проверьте, что после импорта пересчитывается рейтинг'
+        assert 'rows/sec' in capsys.readouterr().out
+
+    def test_reimport_is_idempotent(self, data_dir):
+        call_command('csv', '--path', str(data_dir))
+        before = snapshot()
+        call_command('csv', '--path', str(data_dir))
+        assert snapshot() == before, (
+            'Проверьте, что повторный импорт не дублирует строки'
+        )
+        Genre.objects.create(name='Новый', slug='new')
+
+    def test_export_roundtrip(self, data_dir, tmp_path_factory):
+        export_dir = tmp_path_factory.mktemp('export')
+        call_command('csv', '--path', str(data_dir))
+        before = snapshot()
+        call_command('csv', '--path', str(export_dir), '--export')
+        clear()
+        call_command('csv', '--path', str(export_dir))
+        assert snapshot() == before, (
+            'Проверьте, что выгрузка загружается обратно без потерь'
+        )
+
+    @pytest.mark.skipif(
+        not copy_supported(), reason='COPY есть только в PostgreSQL'
+    )
+    def test_copy_matches_orm(self, data_dir):
+        call_command('csv', '--path', str(data_dir), '--no-copy')
+        orm = snapshot()
+        clear()
+        call_command('csv', '--path', str(data_dir))
+        assert snapshot() == orm, (
+            'Проверьте, что загрузка через COPY даёт тот же результат, '
+            'что и через ORM'
+        )
+
+    def test_resume_from_checkpoint(self, data_dir, tmp_path_factory,
+                                    capsys):
+        checkpoint = tmp_path_factory.mktemp('state') / 'import.json'
+        header, rows = DATA['comments.csv']
+        broken = [list(row) for row in rows]
+        broken[6][0] = 'bad'
+        with open(data_dir / 'comments.csv', 'w', encoding='utf-8',
+                  newline='') as f:
+            csv.writer(f).writerows([header, *broken])
+        # пачками с контрольной точкой грузит ORM, COPY идёт файлом целиком
+        with pytest.raises(ValueError):
+            call_command(
+                'csv', '--path', str(data_dir), '--batch-size', '2',
+                '--checkpoint', str(checkpoint), '--no-copy'
+            )
+        assert checkpoint.exists()
+        assert Comment.objects.count() == 6, (
+            'Проверьте, что пачки до ошибки остаются в базе'
+        )
+
+        with open(data_dir / 'comments.csv', 'w', encoding='utf-8',
+                  newline='') as f:
+            csv.writer(f).writerows([header, *rows])
+        capsys.readouterr()
+        call_command(
+            'csv', '--path', str(data_dir), '--batch-size', '2',
+            '--checkpoint', str(checkpoint), '--no-copy'
+        )
+        out = capsys.readouterr().out
+        assert 'users.csv: 0 rows' in out, (
+            'Проверьте, что загруженные файлы не читаются повторно'
+        )
+        assert 'comments.csv: 4 rows' in out, (
+            'Проверьте, что загрузка продолжается с сохранённого места'
+        )
+        assert Comment.objects.count() == 10
+        assert not checkpoint.exists(), (
+            'Проверьте, что после успешной загрузки checkpoint удаляется'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_import_matches_sequential(data_dir):
+    call_command('csv', '--path', str(data_dir), '--workers', '1')
+    sequential = snapshot()
+    clear()
+    call_command('csv', '--path', str(data_dir), '--workers', '4')
+    assert snapshot() == sequential, (
+        'Проверьте, что параллельная загрузка даёт тот же результат'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_import_is_sequential(data_dir, monkeypatch):
+    if connection.vendor != 'sqlite':
+        pytest.skip('ограничение только для sqlite')
+
+    def no_threads(*args, **kwargs):
+        raise AssertionError('потоки на sqlite')
+
+    monkeypatch.setattr(csv_command, 'ThreadPoolExecutor', no_threads)
+    call_command('csv', '--path', str(data_dir), '--workers', '4')
+    assert Comment.objects.count() == 10, (
+        'Проверьте, что на sqlite файлы грузятся в одном потоке: '
+        'параллельные транзакции упираются в блокировку базы'
+    )
@@ -0,0 +1,161 @@
+import os
+import threading
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection
+from psycopg2.extensions import (TRANSACTION_STATUS_IDLE,
+                                 TRANSACTION_STATUS_INTRANS)
+
+from api_yamdb.postgresql_pool.base import DatabaseWrapper
+from api_yamdb.postgresql_pool.pool import (ConnectionPool, PoolExhausted,
+                                            _pools, pool_stats)
+
+
+class FakeConnection:
+    """Минимум интерфейса соединения psycopg2, который нужен пулу."""
+
+    def __init__(self, healthy=True):
+        self.closed = 0
+        self.healthy = healthy
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def execute(self, sql):
+                if not connection.healthy:
+                    raise OSError('server closed the connection')
+
+        return Cursor()
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool:
+
+    def test_connection_is_reused(self):
+        pool = ConnectionPool(max_size=2)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        assert pool.checkout(FakeConnection) is first, (
+            'Проверьте, что возвращённое соединение выдаётся повторно'
+        )
+        assert pool.stats()['opened'] == 1
+
+    def test_open_transaction_is_rolled_back(self):
+        pool = ConnectionPool(max_size=1)
+        connection = pool.checkout(FakeConnection)
+        connection.status = TRANSACTION_STATUS_INTRANS
+        pool.checkin(connection)
+        assert connection.status == TRANSACTION_STATUS_IDLE
+        assert pool.checkout(FakeConnection) is connection
+
+    def test_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.checkout(FakeConnection)
+        with pytest.raises(PoolExhausted):
+            pool.checkout(FakeConnection)
+        assert pool.stats()['exhausted'] == 1
+
+    def test_waits_for_checkin(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.checkout(FakeConnection)
+        timer = threading.Timer(0.05, pool.checkin, (connection,))
+        timer.start()
+        assert pool.checkout(FakeConnection) is connection
+        timer.join()
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['wait_max_seconds'] >= 0.04
+
+    def test_broken_idle_connection_is_replaced(self):
+        pool = ConnectionPool(max_size=1, check_after=0)
+        broken = pool.checkout(FakeConnection)
+        pool.checkin(broken)
+        broken.healthy = False
+        fresh = pool.checkout(FakeConnection)
+        assert fresh is not broken, (
+            'Проверьте, что соединение, не прошедшее SELECT 1, закрывается'
+        )
+        assert broken.closed
+        stats = pool.stats()
+        assert stats['health_check_failures'] == 1
+        assert (stats['open'], stats['in_use']) == (1, 1)
+
+    def test_old_connection_is_closed(self):
+        pool = ConnectionPool(max_size=1, max_lifetime=0)
+        old = pool.checkout(FakeConnection)
+        pool.checkin(old)
+        assert pool.checkout(FakeConnection) is not old
+        assert old.closed
+
+
+@pytest.mark.django_db
+class TestDatabaseWrapper:
+    """Движок api_yamdb.postgresql_pool поверх тестовой базы PostgreSQL."""
+
+    @pytest.fixture
+    def pooled(self):
+        if connection.vendor != 'postgresql':
+            pytest.skip('движок с пулом работает только с PostgreSQL')
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'ENGINE': 'api_yamdb.postgresql_pool',
+            'POOL': {'MAX_SIZE': 1, 'TIMEOUT': 0.01},
+        }, alias=DEFAULT_DB_ALIAS)
+        yield wrapper
+        wrapper.close()
+        pool = _pools.pop((DEFAULT_DB_ALIAS, os.getpid()), None)
+        while pool is not None and pool.idle:
+            pool.discard(pool.idle.pop()[0])
+
+    def test_close_returns_connection_to_pool(self, pooled):
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = pooled.connection
+        pooled.close()
+        assert not raw.closed, (
+            'Проверьте, что закрытие соединения Django возвращает его в пул'
+        )
+        assert pool_stats()[DEFAULT_DB_ALIAS]['idle'] == 1
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pooled.connection is raw
+        assert pool_stats()[DEFAULT_DB_ALIAS]['opened'] == 1
+
+    def test_exhausted_pool_raises_database_error(self, pooled):
+        pooled.ensure_connection()
+        other = DatabaseWrapper(pooled.settings_dict, alias=DEFAULT_DB_ALIAS)
+        with pytest.raises(OperationalError):
+            other.ensure_connection()
+        assert pool_stats()[DEFAULT_DB_ALIAS]['exhausted'] == 1
+
+    def test_connection_closed_in_atomic_is_discarded(self, pooled):
+        pooled.ensure_connection()
+        raw = pooled.connection
+        # так Django закрывает соединение, потерянное внутри atomic
+        pooled.in_atomic_block = True
+        try:
+            pooled.close()
+        finally:
+            pooled.in_atomic_block = False
+            pooled.connection = None
+        assert raw.closed, (
+            'Проверьте, что соединение, закрытое внутри транзакции, не '
+            'возвращается в пул'
+        )
+        assert pool_stats()[DEFAULT_DB_ALIAS]['idle'] == 0
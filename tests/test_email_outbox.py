@@ -0,0 +1,107 @@
+import pytest
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from user.models import OutboxEmail, User
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('smtp is down')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('smtp is unreachable')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('send without an open connection')
+
+
+def signup(username='user', email='user@ya.ru'):
+    return APIClient().post('/api/v1/auth/signup/',
+                            {'username': username, 'email': email})
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_queues_email(self, mailoutbox):
+        assert signup().status_code == 200
+        assert not mailoutbox, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'user@ya.ru'
+        assert 'confirmation code' in email.body
+
+    def test_repeated_signup_is_coalesced(self):
+        signup()
+        signup()
+        assert OutboxEmail.objects.count() == 1, (
+            'Проверьте, что коды для одного пользователя не копятся'
+        )
+
+    def test_worker_sends_batch(self, mailoutbox):
+        for i in range(3):
+            signup(f'user{i}', f'user{i}@ya.ru')
+        call_command('send_emails', '--once')
+        assert sorted(message.to[0] for message in mailoutbox) == [
+            'user0@ya.ru', 'user1@ya.ru', 'user2@ya.ru'
+        ]
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+        signup('user0', 'user0@ya.ru')
+        assert OutboxEmail.objects.filter(sent_at__isnull=True).count() == 1
+
+    def test_failed_send_is_retried_later(self, settings, mailoutbox):
+        signup()
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.FailingBackend'
+        call_command('send_emails', '--once')
+        email = OutboxEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'smtp is down' in email.last_error
+        user = User.objects.get()
+        assert not OutboxEmail.objects.due(5).exists(), (
+            'Проверьте, что повтор откладывается'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=email.created_at)
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_emails', '--once')
+        assert [message.to for message in mailoutbox] == [[user.email]]
+
+    def test_unreachable_server_is_retried_later(self, settings):
+        for i in range(2):
+            signup(f'user{i}', f'user{i}@ya.ru')
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.UnreachableBackend'
+        call_command('send_emails', '--once')
+        for email in OutboxEmail.objects.all():
+            assert email.sent_at is None
+            assert email.attempts == 1, (
+                'Ошибка соединения должна считаться попыткой для всей пачки'
+            )
+            assert 'smtp is unreachable' in email.last_error
+        assert not OutboxEmail.objects.due(5).exists(), (
+            'Проверьте, что повтор после ошибки соединения откладывается'
+        )
+
+    def test_signup_during_send_keeps_new_code(self, settings, monkeypatch):
+        signup()
+        from user.management.commands.send_emails import Command
+
+        send = Command.send
+
+        def send_and_resignup(self, connection, email):
+            send(self, connection, email)
+            signup()
+
+        monkeypatch.setattr(Command, 'send', send_and_resignup)
+        call_command('send_emails', '--once')
+        email = OutboxEmail.objects.get()
+        assert email.sent_at is None, (
+            'Письмо, заменённое во время отправки, не должно считаться '
+            'отправленным'
+        )
+        assert OutboxEmail.objects.due(5).exists()
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from reviews.exports import title_records
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def catalogue():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+              for i in range(2)]
+    author = User.objects.create(username='author', email='a@ya.ru')
+    titles = []
+    for i in range(5):
+        title = Title.objects.create(name=f'Title {i}', year=2000 + i,
+                                     category=category)
+        title.genre.set(genres[:i % 3])
+        titles.append(title)
+    review = Review.objects.create(title=titles[1], author=author,
+                                   text='review', score=8)
+    Comment.objects.create(review=review, author=author, text='comment')
+    return titles
+
+
+@pytest.fixture
+def admin_client():
+    admin = User.objects.create(username='admin', email='admin@ya.ru',
+                                role='admin')
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_ndjson(self, catalogue, admin_client):
+        response = admin_client.get(
+            '/api/v1/export/titles/', {'comments': '1'}
+        )
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка потоковая'
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = [json.loads(line) for line in content(response).split(
+            '\n') if line]
+        assert [record['id'] for record in records] == [
+            title.id for title in catalogue
+        ]
+        second = records[1]
+        assert second['rating'] == 8.0
+        assert second['category'] == 'movie'
+        assert second['genre'] == ['genre-0']
+        assert second['reviews'][0]['comments'][0]['text'] == 'comment'
+
+    def test_csv(self, catalogue, admin_client):
+        response = admin_client.get(
+            '/api/v1/export/titles/', {'output': 'csv', 'reviews': 'true'}
+        )
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert len(rows) == 5, (
+            'Проверьте, что произведение без отзывов даёт одну строку'
+        )
+        assert rows[2]['genre'] == 'genre-0,genre-1'
+        assert rows[1]['review_score'] == '8'
+
+    def test_query_count_does_not_grow(self, catalogue, admin_client,
+                                       django_assert_max_num_queries):
+        with django_assert_max_num_queries(4):
+            response = admin_client.get(
+                '/api/v1/export/titles/', {'comments': '1'}
+            )
+            content(response)
+
+    def test_streams_merge_in_title_order(self, catalogue,
+                                          django_assert_num_queries):
+        # отзывы позднего произведения созданы раньше, id идут не по порядку
+        authors = [User.objects.create(username=f'user{i}',
+                                       email=f'user{i}@ya.ru')
+                   for i in range(3)]
+        for title in (catalogue[4], catalogue[0]):
+            for author in authors:
+                review = Review.objects.create(
+                    title=title, author=author, text=title.name, score=5
+                )
+                for i in range(2):
+                    Comment.objects.create(review=review, author=author,
+                                           text=f'{title.name} {i}')
+        with django_assert_num_queries(4):
+            records = list(title_records(comments=True, chunk_size=1))
+        for record in records:
+            for review in record['reviews']:
+                if review['text'] == 'review':
+                    continue
+                assert review['text'] == record['name'], (
+                    'Проверьте, что отзывы попадают к своему произведению'
+                )
+                assert [c['text'] for c in review['comments']] == [
+                    f'{record["name"]} 0', f'{record["name"]} 1'
+                ]
+        assert [len(record['reviews']) for record in records] == [
+            3, 1, 0, 0, 3
+        ]
+
+    def test_admin_only(self, catalogue):
+        user = User.objects.create(username='user', email='u@ya.ru')
+        client = APIClient()
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        client.force_authenticate(user)
+        assert client.get('/api/v1/export/titles/').status_code == 403
+
+    def test_command(self, catalogue, capsys):
+        call_command('export_titles', '--chunk-size', '2')
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 5
+        assert json.loads(lines[4])['name'] == 'Title 4'
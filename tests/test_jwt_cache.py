@@ -0,0 +1,114 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.authentication import (CHANGED_KEY, UserCache,
+                                   access_token_for, user_cache)
+from user.models import User
+
+
+def client_with(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestJWTUserCache:
+
+    def test_token_has_role_claims(self):
+        user = User.objects.create(username='admin', email='a@ya.ru',
+                                   role='admin')
+        response = APIClient().post('/api/v1/auth/token/', {
+            'username': 'admin',
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        token = AccessToken(response.json()['token'])
+        assert (token['username'], token['role'], token['is_superuser']) == (
+            'admin', 'admin', False
+        ), 'Проверьте, что get_jwt_token кладёт роль в токен'
+
+    def test_no_auth_queries(self, django_assert_num_queries):
+        user = User.objects.create(username='user', email='u@ya.ru')
+        admin = User.objects.create(username='admin', email='a@ya.ru',
+                                    role='admin')
+        # токен выдан в ту же секунду, что и создание пользователя, и
+        # считался бы устаревшим; отодвигаем отметку об изменении
+        for pk in (user.pk, admin.pk):
+            cache.set(CHANGED_KEY.format(pk), 0)
+        client = client_with(access_token_for(user))
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'user', (
+            'Проверьте, что профиль читается из базы, а пользователь '
+            'для аутентификации — из токена'
+        )
+        with django_assert_num_queries(0):
+            response = client_with(access_token_for(admin)).get('/api/v1/')
+        assert response.status_code == 200
+
+    def test_role_change_is_seen_by_old_token(self):
+        user = User.objects.create(username='user', email='u@ya.ru',
+                                   role='admin')
+        client = client_with(access_token_for(user))
+        assert client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+        ).status_code == 201
+        admin = User.objects.create(username='root', email='r@ya.ru',
+                                    role='admin')
+        response = client_with(access_token_for(admin)).patch(
+            '/api/v1/users/user/', {'role': 'user'}
+        )
+        assert response.status_code == 200
+        assert client.post(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'}
+        ).status_code == 403, (
+            'Проверьте, что смена роли действует на уже выданный токен'
+        )
+
+    @pytest.mark.parametrize('change', (
+        {'role': 'user'}, {'is_active': False}
+    ))
+    def test_evicted_change_mark_is_not_trusted(self, change):
+        user = User.objects.create(username='user', email='u@ya.ru',
+                                   role='admin')
+        client = client_with(access_token_for(user))
+        assert client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+        ).status_code == 201
+        User.objects.filter(pk=user.pk).update(**change)
+        # отметку об изменении вытеснили из кэша вместе с копией в процессе
+        cache.delete(CHANGED_KEY.format(user.pk))
+        user_cache.clear()
+        assert client.post(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'}
+        ).status_code in (401, 403), (
+            'Проверьте, что без отметки об изменении пользователь '
+            'читается из базы, а не из ролей в токене'
+        )
+        assert cache.get(CHANGED_KEY.format(user.pk)) is not None, (
+            'Проверьте, что отметка об изменении заводится заново'
+        )
+
+    def test_tokens_without_claims_are_cached(
+        self, django_assert_num_queries
+    ):
+        user = User.objects.create(username='user', email='u@ya.ru')
+        client = client_with(AccessToken.for_user(user))
+        with django_assert_num_queries(1):
+            client.get('/api/v1/')
+        with django_assert_num_queries(0):
+            client.get('/api/v1/')
+
+    def test_cache_is_bounded(self):
+        users = UserCache(size=2, ttl=60)
+        for user_id in range(3):
+            users.set(user_id, user_id)
+        assert users.get(0) is None
+        assert users.get(2) == 2
+        users = UserCache(size=2, ttl=-1)
+        users.set(1, 1)
+        assert users.get(1) is None, 'Проверьте время жизни записи'
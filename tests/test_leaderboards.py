@@ -0,0 +1,89 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from reviews import signals
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from user.models import User
+
+
+@pytest.fixture
+def catalogue():
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    category = Category.objects.create(name='Фильм', slug='movie')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(name=f'Title {i}', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+        titles.append(title)
+    return titles
+
+
+def positions(kind, slug):
+    response = APIClient().get(f'/api/v1/leaderboards/{kind}/{slug}/')
+    assert response.status_code == 200
+    return [(entry['title']['name'], entry['rating'])
+            for entry in response.json()]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_review_updates_leaderboards(
+        self, catalogue, django_capture_on_commit_callbacks
+    ):
+        author = User.objects.create(username='author', email='a@ya.ru')
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(title=catalogue[0], author=author,
+                                  text='a', score=6)
+            Review.objects.create(title=catalogue[2], author=author,
+                                  text='b', score=9)
+        expected = [('Title 2', 9.0), ('Title 0', 6.0)]
+        assert positions('genres', 'drama') == expected, (
+            'Проверьте, что отзывы обновляют топ жанра'
+        )
+        assert positions('categories', 'movie') == expected, (
+            'Проверьте, что отзывы обновляют топ категории'
+        )
+
+    def test_text_edit_skips_refresh(self, catalogue, monkeypatch):
+        author = User.objects.create(username='author', email='a@ya.ru')
+        review = Review.objects.create(title=catalogue[0], author=author,
+                                       text='a', score=6)
+        refreshed = []
+        monkeypatch.setattr(signals, 'refresh_title_on_commit',
+                            refreshed.append)
+        review.text = 'исправленный текст'
+        review.save()
+        assert refreshed == [], (
+            'Проверьте, что правка текста отзыва не пересчитывает топы'
+        )
+        review.score = 8
+        review.save()
+        assert refreshed == [catalogue[0].pk]
+
+    def test_read_is_single_query(self, catalogue,
+                                  django_assert_num_queries):
+        author = User.objects.create(username='author', email='a@ya.ru')
+        Review.objects.create(title=catalogue[1], author=author, text='a',
+                              score=3)
+        call_command('leaderboards')
+        with django_assert_num_queries(1):
+            assert positions('genres', 'drama') == [('Title 1', 3.0)]
+
+    def test_genre_removal_drops_title(
+        self, catalogue, django_capture_on_commit_callbacks
+    ):
+        author = User.objects.create(username='author', email='a@ya.ru')
+        Review.objects.create(title=catalogue[1], author=author, text='a',
+                              score=3)
+        call_command('leaderboards')
+        with django_capture_on_commit_callbacks(execute=True):
+            catalogue[1].genre.clear()
+        assert positions('genres', 'drama') == []
+        assert TitleRanking.objects.filter(kind='category').count() == 1
+
+    def test_unknown_group(self):
+        response = APIClient().get('/api/v1/leaderboards/genres/unknown/')
+        assert response.status_code == 404
@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.v1.metrics import empty_series, registry
+from api.v1.serializers import TitleSerializerRead
+from api_yamdb.postgresql_pool import pool as pools
+from reviews.models import Title
+from user.models import User
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    registry.reset()
+    return tmp_path
+
+
+def scrape():
+    admin = User.objects.create(username='admin', email='admin@ya.ru',
+                                role='admin')
+    client = APIClient()
+    client.force_authenticate(admin)
+    response = client.get('/api/v1/metrics/')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    return response.content.decode()
+
+
+def value(text, metric, **labels):
+    selector = ','.join(f'{name}="{label}"' for name, label in labels.items())
+    match = re.search(
+        rf'^{metric}{{{re.escape(selector)}}} (\S+)$', text, re.MULTILINE
+    )
+    assert match, f'{metric} {selector} нет в метриках'
+    return float(match.group(1))
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_request_metrics(self, metrics_dir):
+        Title.objects.create(name='Title', year=2000)
+        client = APIClient()
+        for _ in range(2):
+            assert client.get('/api/v1/titles/').status_code == 200
+        client.get('/api/v1/titles/0/')
+        text = scrape()
+        route = {'route': 'titles-list', 'method': 'GET'}
+        assert value(text, 'api_request_duration_seconds_count',
+                     **route) == 2
+        assert value(text, 'api_request_duration_seconds_bucket',
+                     **route, le='+Inf') == 2
+        assert value(text, 'api_db_queries_total', **route) > 0, (
+            'Проверьте, что считаются запросы к базе'
+        )
+        assert value(text, 'api_serialize_seconds_total', **route) > 0, (
+            'Проверьте, что считается время сериализаторов'
+        )
+        assert value(text, 'api_render_seconds_total', **route) > 0
+        assert value(text, 'api_response_bytes_total', **route) > 0
+        assert value(text, 'api_requests_total', route='titles-detail',
+                     method='GET', status='404') == 1
+
+    def test_serializer_time_is_not_render_time(self, metrics_dir,
+                                                monkeypatch):
+        title = Title.objects.create(name='Title', year=2000)
+        slow = TitleSerializerRead.to_representation
+
+        def to_representation(serializer, instance):
+            time.sleep(0.05)
+            return slow(serializer, instance)
+
+        monkeypatch.setattr(
+            TitleSerializerRead, 'to_representation', to_representation
+        )
+        assert APIClient().get(f'/api/v1/titles/{title.id}/').status_code == (
+            200
+        )
+        text = scrape()
+        route = {'route': 'titles-detail', 'method': 'GET'}
+        assert value(text, 'api_serialize_seconds_total', **route) >= 0.05, (
+            'Проверьте, что время сериализатора попадает в '
+            'api_serialize_seconds_total'
+        )
+        assert value(text, 'api_render_seconds_total', **route) < 0.05
+
+    def test_other_workers_are_summed(self, metrics_dir):
+        series = empty_series()
+        series.update(count=3, db_queries=7, statuses={'200': 3})
+        (metrics_dir / 'other-worker.json').write_text(
+            json.dumps({'requests': {'genres-list GET': series}})
+        )
+        APIClient().get('/api/v1/genres/')
+        text = scrape()
+        assert value(text, 'api_request_duration_seconds_count',
+                     route='genres-list', method='GET') == 4, (
+            'Проверьте, что метрики всех воркеров складываются'
+        )
+
+    def test_pool_metrics(self, metrics_dir):
+        pool = pools.get_pool('metrics-test', {'max_size': 3})
+        try:
+            pool.checkout(object)
+            other = pools.ConnectionPool(max_size=2).stats()
+            other.update(open=2, idle=2, checkouts=5, wait_max_seconds=1.5)
+            (metrics_dir / 'other-worker.json').write_text(
+                json.dumps({'pools': {'metrics-test': other}})
+            )
+            text = scrape()
+        finally:
+            pools._pools.pop(('metrics-test', os.getpid()))
+        database = {'database': 'metrics-test'}
+        assert value(text, 'api_db_pool_max_size', **database) == 5, (
+            'Проверьте, что метрики пулов всех воркеров складываются'
+        )
+        assert value(text, 'api_db_pool_in_use', **database) == 1
+        assert value(text, 'api_db_pool_idle', **database) == 2
+        assert value(text, 'api_db_pool_checkouts_total', **database) == 6
+        assert value(text, 'api_db_pool_wait_max_seconds', **database) == 1.5
+
+    def test_admin_only(self, metrics_dir):
+        user = User.objects.create(username='user', email='u@ya.ru')
+        client = APIClient()
+        client.force_authenticate(user)
+        assert client.get('/api/v1/metrics/').status_code == 403
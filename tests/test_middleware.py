@@ -0,0 +1,35 @@
+import pytest
+from django.test import Client
+
+
+@pytest.mark.django_db
+class TestApiMiddleware:
+
+    def test_api_skips_browser_middleware(self, django_assert_num_queries):
+        client = Client(enforce_csrf_checks=True)
+        client.cookies['sessionid'] = 'x' * 32
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/')
+        assert response.status_code == 200
+        assert 'X-Frame-Options' not in response, (
+            'Проверьте, что ответы API не проходят через XFrameOptions'
+        )
+        assert not response.cookies, (
+            'Проверьте, что API не трогает сессию и CSRF-куку'
+        )
+
+    def test_api_post_needs_no_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(
+            '/api/v1/auth/token/', {'username': 'nobody'},
+            content_type='application/json'
+        )
+        assert response.status_code != 403
+
+    def test_admin_keeps_full_stack(self):
+        response = Client().get('/admin/login/')
+        assert response.status_code == 200
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies, (
+            'Проверьте, что админка по-прежнему получает CSRF'
+        )
@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def title_with_reviews():
+    title = Title.objects.create(name='Title', year=2000)
+    for i in range(12):
+        author = User.objects.create(username=f'user{i}',
+                                     email=f'user{i}@ya.ru')
+        Review.objects.create(title=title, author=author, text=f'review {i}',
+                              score=5)
+    return title
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_page_number_is_default(self, title_with_reviews):
+        response = APIClient().get(
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+        )
+        assert response.json()['count'] == 12, (
+            'Проверьте, что по умолчанию используются номера страниц'
+        )
+
+    def test_cursor_walks_all_reviews(self, title_with_reviews):
+        client = APIClient()
+        url = (f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+               '?pagination=cursor')
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = client.get(url).json()
+            assert 'count' not in data
+            assert not any('COUNT(' in query['sql'].upper()
+                           for query in queries.captured_queries), (
+                'Проверьте, что курсорный режим не выполняет COUNT'
+            )
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсор проходит все отзывы без пропусков'
+        )
+
+    def test_cursor_for_titles(self):
+        for i in range(7):
+            Title.objects.create(name=f'Title {i}', year=2000)
+        data = APIClient().get('/api/v1/titles/?pagination=cursor').json()
+        assert [title['name'] for title in data['results']] == [
+            f'Title {i}' for i in range(5)
+        ]
+        assert data['next'] and data['previous'] is None
@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from user.models import User
+
+# маршрут -> (бюджет запросов, метод, параметры URL, тело запроса);
+# новый маршрут без бюджета роняет test_every_route_has_budget
+TITLE = {'title_id': 'title'}
+REVIEW = {'title_id': 'title', 'review_id': 'review'}
+ROUTES = {
+    'api-root': (0, 'get', {}, None),
+    'titles-list': (3, 'get', {}, None),
+    'titles-detail': (3, 'get', {'pk': 'title'}, None),
+    'genres-list': (2, 'get', {}, None),
+    'genres-detail': (4, 'delete', {'slug': 'genre'}, None),
+    'categories-list': (2, 'get', {}, None),
+    'categories-detail': (4, 'delete', {'slug': 'category'}, None),
+    'reviews-list': (3, 'get', TITLE, None),
+    'reviews-detail': (4, 'get', {**TITLE, 'pk': 'review'}, None),
+    'comments-list': (3, 'get', REVIEW, None),
+    'comments-detail': (4, 'get', {**REVIEW, 'pk': 'comment'}, None),
+    'leaderboards-list': (1, 'get', {'kind': 'genres', 'slug': 'genre'},
+                          None),
+    'user-list': (2, 'get', {}, None),
+    'user-detail': (1, 'get', {'username': 'author'}, None),
+    'user-users-own-profile': (1, 'get', {}, None),
+    'export_titles': (2, 'get', {}, None),
+    'metrics': (0, 'get', {}, None),
+    'register': (11, 'post', {}, {'username': 'new', 'email': 'new@ya.ru'}),
+    'token': (2, 'post', {}, None),
+}
+
+
+def api_route_names():
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns,
+                                prefix + str(pattern.pattern))
+            elif (prefix + str(pattern.pattern)).startswith('api/v1/'):
+                yield pattern.name
+
+    return set(walk(get_resolver().url_patterns))
+
+
+@pytest.fixture
+def seeded():
+    """По нескольку объектов на каждом уровне, чтобы N+1 был заметен."""
+    category = Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+              for i in range(3)]
+    authors = [User.objects.create(username=f'author{i}',
+                                   email=f'author{i}@ya.ru')
+               for i in range(4)]
+    titles = []
+    for i in range(6):
+        title = Title.objects.create(name=f'Title {i}', year=2000 + i,
+                                     category=category)
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(title=title, author=author, text='text',
+                              score=5 + i)
+        for title in titles for i, author in enumerate(authors[:3])
+    ]
+    for review in reviews:
+        for author in authors:
+            Comment.objects.create(review=review, author=author,
+                                   text='comment')
+    call_command('leaderboards')
+    admin = User.objects.create(username='admin', email='admin@ya.ru',
+                                role='admin')
+    return {
+        'title': titles[0].pk,
+        'review': reviews[0].pk,
+        'comment': reviews[0].comments.first().pk,
+        'genre': genres[0].slug,
+        'category': 'book',
+        'author': authors[0].username,
+        'admin': admin,
+    }
+
+
+def test_every_route_has_budget():
+    assert api_route_names() == set(ROUTES), (
+        'Проверьте, что у каждого маршрута api/v1 объявлен бюджет запросов'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', sorted(ROUTES))
+def test_query_budget(name, seeded, query_budget):
+    budget, method, kwargs, data = ROUTES[name]
+    url = reverse(name, kwargs={
+        key: seeded.get(value, value) for key, value in kwargs.items()
+    })
+    client = APIClient()
+    if name == 'token':
+        data = {
+            'username': seeded['author'],
+            'confirmation_code': default_token_generator.make_token(
+                User.objects.get(username=seeded['author'])
+            ),
+        }
+    else:
+        client.force_authenticate(seeded['admin'])
+    with query_budget(budget, label=f'{method.upper()} {name}'):
+        response = getattr(client, method)(url, data, format='json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code < 400, response.content
+
+
+@pytest.mark.django_db
+def test_n_plus_one_is_detected(seeded, query_budget):
+    with pytest.raises(pytest.fail.Exception, match='N\\+1'):
+        with query_budget(100, label='category per title'):
+            for title in Title.objects.all():
+                title.category.name
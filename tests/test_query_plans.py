@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from reviews.generation import Generator
+from reviews.models import Comment, Title
+from tests.query_plans import (check_plans, postgres_scan, regressions,
+                               sqlite_scan)
+
+SCALE = 5000
+# ключевые запросы TitleViewSet, ReviewViewSet и CommentViewSet
+URLS = {
+    'titles-list': '/api/v1/titles/',
+    'titles-list-genre': '/api/v1/titles/?genre={genre}',
+    'titles-list-category': '/api/v1/titles/?category={category}',
+    'titles-list-year': '/api/v1/titles/?year_min=2001&year_max=2003',
+    'titles-list-rating': '/api/v1/titles/?ordering=-rating',
+    'titles-detail': '/api/v1/titles/{title}/',
+    'reviews-list': '/api/v1/titles/{title}/reviews/',
+    'reviews-detail': '/api/v1/titles/{title}/reviews/{review}/',
+    'comments-list': '/api/v1/titles/{title}/reviews/{review}/comments/',
+}
+
+
+@pytest.fixture
+def catalogue():
+    """Каталог, на котором планировщик postgres уже выбирает индексы.
+
+    На пяти строках он честно читает таблицу целиком, и снимок ничего
+    не проверял бы.
+    """
+    for _ in Generator(SCALE, batch_size=500).run():
+        pass
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    comment = Comment.objects.select_related('review').order_by('pk').first()
+    title = Title.objects.get(pk=comment.review.title_id)
+    return {
+        'title': title.pk,
+        'review': comment.review_id,
+        'genre': title.genre.first().slug,
+        'category': title.category.slug,
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('label', sorted(URLS))
+def test_plan_keeps_indexes(label, catalogue, query_plans):
+    with query_plans(label):
+        response = APIClient().get(URLS[label].format(**catalogue))
+    assert response.status_code == 200, response.content
+
+
+@pytest.mark.django_db
+def test_seq_scan_fails(catalogue, monkeypatch):
+    monkeypatch.setattr(
+        'tests.query_plans.load_snapshots',
+        lambda vendor: {'unindexed': {'reviews_title': ['title_name_id_idx']}}
+    )
+    with pytest.raises(pytest.fail.Exception, match='полным проходом'):
+        with check_plans('unindexed'):
+            list(Title.objects.filter(description='нет индекса').order_by())
+
+
+class TestPlanParsing:
+
+    def test_sqlite(self):
+        assert sqlite_scan('SCAN reviews_title') == ('reviews_title', 'seq')
+        assert sqlite_scan(
+            'SEARCH reviews_review USING INDEX review_title_pub_date_idx '
+            '(title_id=?)'
+        ) == ('reviews_review', 'review_title_pub_date_idx')
+        assert sqlite_scan(
+            'SEARCH reviews_title USING INTEGER PRIMARY KEY (rowid=?)'
+        ) == ('reviews_title', 'pk')
+        assert sqlite_scan(
+            'SEARCH T USING AUTOMATIC COVERING INDEX (genre_id=?)'
+        ) == ('T', 'seq'), 'Автоматический индекс — это полный проход'
+        assert sqlite_scan('USE TEMP B-TREE FOR ORDER BY') is None
+
+    def test_postgres(self):
+        assert postgres_scan(
+            'Seq Scan on reviews_title  (cost=0.00..1.05 rows=5 width=4)'
+        ) == ('reviews_title', 'seq')
+        assert postgres_scan(
+            '->  Index Scan Backward using title_rating_idx on '
+            'reviews_title  (cost=0.28..8.30 rows=1 width=4)'
+        ) == ('reviews_title', 'title_rating_idx')
+        assert postgres_scan(
+            'Bitmap Heap Scan on reviews_review  (cost=4.18..12.64)'
+        ) == ('reviews_review', 'bitmap')
+        assert postgres_scan(
+            '  ->  Bitmap Index Scan on review_title_pub_date_idx'
+        ) is None, 'Bitmap Index Scan называет индекс, а не таблицу'
+        assert postgres_scan(
+            '->  Parallel Seq Scan on reviews_review'
+        ) == ('reviews_review', 'seq')
+
+    def test_index_to_seq_is_regression(self):
+        before = {'reviews_review': ['review_title_pub_date_idx']}
+        assert regressions(before, {'reviews_review': ['seq']}), (
+            'Переход с индекса на полный проход должен ловиться'
+        )
+        assert not regressions(
+            before, {'reviews_review': ['other_idx']}
+        ), 'Смена индекса не считается регрессией'
+        assert not regressions(
+            {'reviews_title': ['seq']}, {'reviews_title': ['seq']}
+        ), 'Полный проход, уже бывший в снимке, не регрессия'
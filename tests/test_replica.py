@@ -0,0 +1,119 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.cache import cache_stats
+from api.v1.replica import REPLICA, ReplicaRouter, RequestState, _state
+from reviews.models import Category, Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def replica_router(settings):
+    settings.DATABASE_ROUTERS = ['api.v1.replica.ReplicaRouter']
+    settings.REPLICA_STICKY_SECONDS = 60
+
+
+def replicate(model, **fields):
+    """Одна и та же строка в основной базе и в «реплике»."""
+    obj = model.objects.create(**fields)
+    model.objects.using(REPLICA).create(pk=obj.pk, **fields)
+    return obj
+
+
+def client_for(user=None):
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+    return client
+
+
+def review_texts(client, title):
+    response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+    assert response.status_code == 200
+    return [review['text'] for review in response.json()['results']]
+
+
+# транзакционный тест: внутри транзакции роутер читает с основной базы
+@pytest.mark.django_db(transaction=True, databases=['default', REPLICA])
+@pytest.mark.usefixtures('replica_router')
+class TestReplica:
+
+    def test_reads_go_to_replica(self):
+        category = replicate(Category, name='Фильм', slug='movie')
+        Title.objects.create(name='Только в основной', year=2000,
+                             category=category)
+        response = client_for().get('/api/v1/titles/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что GET-запросы к API читают с реплики'
+        )
+
+    def test_asgi_reads_go_to_replica(self):
+        category = replicate(Category, name='Фильм', slug='movie')
+        Title.objects.create(name='Только в основной', year=2000,
+                             category=category)
+        response = async_to_sync(AsyncClient().get)('/api/v1/titles/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что под ASGI GET-запросы к API читают с реплики'
+        )
+
+    def test_lagging_replica_is_not_cached(self):
+        category = replicate(Category, name='Фильм', slug='movie')
+        Title.objects.create(name='Только в основной', year=2000,
+                             category=category)
+        client = client_for()
+        for _ in range(2):
+            response = client.get('/api/v1/titles/')
+            assert response.json()['count'] == 0
+            assert 'ETag' not in response, (
+                'Проверьте, что ответ реплики сразу после изменения '
+                'отдаётся без ETag'
+            )
+        assert cache_stats() == {'hits': 0, 'misses': 2}, (
+            'Проверьте, что ответ реплики сразу после изменения не '
+            'кэшируется под новой версией'
+        )
+
+    def test_replica_is_cached_after_lag(self, settings):
+        settings.REPLICA_STICKY_SECONDS = -1
+        replicate(Category, name='Фильм', slug='movie')
+        client = client_for()
+        response = client.get('/api/v1/titles/')
+        assert 'ETag' in response
+        client.get('/api/v1/titles/')
+        assert cache_stats() == {'hits': 1, 'misses': 1}, (
+            'Проверьте, что вне окна отставания реплики список кэшируется'
+        )
+
+    def test_author_sees_own_review(self):
+        user = replicate(User, username='author', email='a@ya.ru')
+        title = replicate(Title, name='Title', year=2000)
+        response = client_for(user).post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'свежий отзыв', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert Review.objects.using(REPLICA).count() == 0
+        assert review_texts(client_for(user), title) == ['свежий отзыв'], (
+            'Проверьте, что после записи пользователь читает с основной базы'
+        )
+        assert review_texts(client_for(), title) == []
+
+
+def test_reads_after_write_stay_on_primary():
+    router = ReplicaRouter()
+    token = _state.set(RequestState(replica=True))
+    try:
+        assert router.db_for_read(Title) == REPLICA
+        assert router.db_for_write(Title) == 'default'
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что чтение после записи в том же запросе идёт на '
+            'основную базу'
+        )
+    finally:
+        _state.reset(token)
+    assert router.db_for_read(Title) == 'default'
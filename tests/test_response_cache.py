@@ -0,0 +1,49 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.v1.cache import cache_stats
+from reviews.models import Genre, Review, Title
+from user.models import User
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_list_is_served_from_cache(self, django_assert_num_queries):
+        Genre.objects.create(name='Драма', slug='drama')
+        client = APIClient()
+        first = client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/genres/')
+        assert first.json() == second.json()
+        assert cache_stats() == {'hits': 1, 'misses': 1}
+
+    def test_query_params_are_part_of_key(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        client = APIClient()
+        assert client.get('/api/v1/genres/').json()['count'] == 2
+        response = client.get('/api/v1/genres/?search=Драма')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что параметры поиска входят в ключ кэша'
+        )
+
+    def test_save_invalidates_list(self):
+        client = APIClient()
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+        Genre.objects.create(name='Драма', slug='drama')
+        assert client.get('/api/v1/genres/').json()['count'] == 1, (
+            'Проверьте, что создание жанра сбрасывает кэш списка'
+        )
+
+    def test_review_invalidates_title_rating(self):
+        title = Title.objects.create(name='Title', year=2000)
+        client = APIClient()
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] is None
+        author = User.objects.create(username='author', email='a@ya.ru')
+        Review.objects.create(title=title, author=author, text='a', score=7)
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] == 7.0, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений'
+        )
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from user.models import User
+
+
+def post_review(user, title, results, barrier):
+    client = APIClient()
+    client.force_authenticate(user)
+    barrier.wait()
+    try:
+        response = client.post(f'/api/v1/titles/{title.id}/reviews/',
+                               {'text': 'text', 'score': 5})
+        results.append((response.status_code, response.json()))
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username='author', email='author@ya.ru')
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Title', year=2000)
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_duplicate_review(self, author, title):
+        client = APIClient()
+        client.force_authenticate(author)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert client.post(url, {'text': 'a', 'score': 5}).status_code == 201
+        response = client.post(url, {'text': 'b', 'score': 6})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв возвращает 400'
+        )
+        assert response.json() == {
+            'non_field_errors': ['нельзя оставить отзыв дважды']
+        }
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 1)
+
+    def test_create_uses_single_title_lookup(
+        self, author, title, django_assert_max_num_queries
+    ):
+        client = APIClient()
+        client.force_authenticate(author)
+        # поиск произведения, вставка отзыва, обновление рейтинга
+        # и точки сохранения транзакции
+        with django_assert_max_num_queries(7) as queries:
+            response = client.post(f'/api/v1/titles/{title.id}/reviews/',
+                                   {'text': 'a', 'score': 5})
+        assert response.status_code == 201
+        selects = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('SELECT')]
+        assert len(selects) == 1, (
+            'Проверьте, что произведение загружается один раз'
+        )
+
+    def test_unknown_title(self, author):
+        client = APIClient()
+        client.force_authenticate(author)
+        response = client.post('/api/v1/titles/404/reviews/',
+                               {'text': 'a', 'score': 5})
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_duplicate_reviews(author, title):
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = []
+    threads = [
+        threading.Thread(target=post_review,
+                         args=(author, title, results, barrier))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    statuses = sorted(status for status, _ in results)
+    assert statuses == [201] + [400] * (workers - 1), (
+        'Проверьте, что из параллельных дублей создаётся один отзыв, '
+        'а остальные получают 400'
+    )
+    assert Review.objects.filter(title=title, author=author).count() == 1
+    title.refresh_from_db()
+    assert (title.rating_sum, title.rating_count) == (5, 1)
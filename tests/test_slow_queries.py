@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+
+from api.v1 import slow_queries
+from api.v1.slow_queries import explain
+from reviews.models import Genre, Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def titles(metrics_dir):
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for i in range(3):
+        Title.objects.create(name=f'Title {i}', year=2000).genre.set([genre])
+
+
+def slow_records(caplog):
+    return [record.getMessage() for record in caplog.records
+            if record.name == 'api.slow_queries']
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+
+    def test_off_by_default(self, titles, caplog):
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            APIClient().get('/api/v1/titles/?genre=drama')
+        assert not slow_records(caplog), (
+            'Без SLOW_QUERY_MS медленные запросы не логируются'
+        )
+
+    def test_logs_plan_and_view(self, titles, settings, caplog):
+        settings.SLOW_QUERY_MS = 1e-6
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            response = APIClient().get('/api/v1/titles/?genre=drama')
+        assert response.status_code == 200
+        records = slow_records(caplog)
+        assert records, 'Запросы дольше порога должны попадать в лог'
+        genre_query = next(
+            (message for message in records if 'reviews_genre' in message
+             and 'slug' in message),
+            None
+        )
+        assert genre_query, 'В логе должен быть запрос фильтра по жанру'
+        assert 'titles-list GET /api/v1/titles/?genre=drama' in genre_query, (
+            'В логе должно быть представление, откуда пришёл запрос'
+        )
+        assert 'scan' in genre_query.lower() or 'search' in genre_query.lower(), (
+            'В логе должен быть план EXPLAIN'
+        )
+        assert not any('EXPLAIN' in message.split('\n')[1]
+                       for message in records), (
+            'Сам EXPLAIN не должен логироваться как медленный запрос'
+        )
+
+    def test_failed_explain_keeps_transaction(self, titles):
+        with transaction.atomic():
+            plan = explain(connection, 'SELECT * FROM no_such_table', None)
+            assert plan.startswith('EXPLAIN failed'), (
+                'Ошибка драйвера в EXPLAIN не должна выходить наружу'
+            )
+            assert Title.objects.count() == 3, (
+                'Ошибка EXPLAIN не должна прерывать транзакцию запроса'
+            )
+
+    def test_failed_explain_keeps_request(self, titles, settings, caplog,
+                                          monkeypatch):
+        settings.SLOW_QUERY_MS = 1e-6
+        monkeypatch.setitem(
+            slow_queries.EXPLAIN, connection.vendor, 'EXPLAIN BROKEN '
+        )
+        author = User.objects.create(username='author', email='a@ya.ru')
+        client = APIClient()
+        client.force_authenticate(author)
+        title = Title.objects.first()
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            response = client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                {'text': 'text', 'score': 7}
+            )
+        assert response.status_code == 201, response.content
+        assert Review.objects.filter(title=title).exists()
+        assert any('EXPLAIN failed' in message
+                   for message in slow_records(caplog))
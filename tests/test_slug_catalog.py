@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.v1.serializers import TitleSerializerCreate
+from reviews.models import Category, Genre, Title
+from user.models import User
+
+GENRES = [f'genre-{i}' for i in range(8)]
+
+
+@pytest.fixture
+def admin_client():
+    for slug in GENRES:
+        Genre.objects.create(name=slug, slug=slug)
+    Category.objects.create(name='Фильм', slug='movie')
+    admin = User.objects.create(username='admin', email='admin@ya.ru',
+                                role='admin')
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def slug_queries(data):
+    with CaptureQueriesContext(connection) as context:
+        serializer = TitleSerializerCreate(data=data)
+        valid = serializer.is_valid()
+    return serializer, valid, [
+        query['sql'] for query in context.captured_queries
+        if 'reviews_genre' in query['sql']
+        or 'reviews_category' in query['sql']
+    ]
+
+
+def title_data(genres=GENRES, category='movie'):
+    return {'name': 'Title', 'year': 2000, 'genre': genres,
+            'category': category}
+
+
+@pytest.mark.django_db
+class TestSlugCatalog:
+
+    def test_slugs_resolved_without_query_per_slug(self, admin_client):
+        serializer, valid, queries = slug_queries(title_data())
+        assert valid, serializer.errors
+        assert len(queries) <= 2, (
+            'Жанры и категория должны читаться одним запросом на модель, '
+            'а не запросом на каждый slug'
+        )
+        assert [genre.slug for genre in serializer.validated_data['genre']] \
+            == GENRES
+        serializer, valid, queries = slug_queries(title_data())
+        assert valid and not queries, (
+            'Повторная проверка должна брать slug из каталога процесса'
+        )
+
+    def test_unknown_slug(self, admin_client):
+        slug_queries(title_data())
+        serializer, valid, queries = slug_queries(
+            title_data(genres=[GENRES[0], 'missing'])
+        )
+        assert not valid
+        assert 'missing' in str(serializer.errors['genre']), (
+            'Ошибка должна называть несуществующий slug'
+        )
+        assert len(queries) == 1, (
+            'Недостающие slug ищутся в базе одним запросом'
+        )
+        serializer, valid, _ = slug_queries(title_data(genres='genre-0'))
+        assert not valid and 'genre' in serializer.errors, (
+            'Строка вместо списка жанров должна быть ошибкой'
+        )
+
+    def test_catalog_follows_genre_viewset(self, admin_client):
+        slug_queries(title_data())
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == 201
+        serializer, valid, queries = slug_queries(title_data(genres=['new']))
+        assert valid, 'Новый жанр должен сразу находиться по slug'
+        assert queries, 'Создание жанра должно сбросить каталог процесса'
+        response = admin_client.delete('/api/v1/categories/movie/')
+        assert response.status_code == 204
+        serializer, valid, _ = slug_queries(title_data(genres=['new']))
+        assert not valid and 'category' in serializer.errors, (
+            'Удалённая категория не должна оставаться в каталоге'
+        )
+
+    def test_create_and_patch_title(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/titles/', title_data(), format='json'
+        )
+        assert response.status_code == 201, response.content
+        title = Title.objects.get()
+        assert title.genre.count() == len(GENRES)
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', {'genre': GENRES[:2]},
+            format='json'
+        )
+        assert response.status_code == 200, response.content
+        assert sorted(title.genre.values_list('slug', flat=True)) == (
+            GENRES[:2]
+        ), 'PATCH должен заменить жанры произведения'
@@ -0,0 +1,57 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from user.models import User
+
+
+@pytest.fixture
+def titles():
+    authors = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@ya.ru')
+        for i in range(3)
+    ]
+    scores = {
+        ('Alpha', 2019): (10,),
+        ('Beta', 2020): (4, 6, 8),
+        ('Gamma', 2021): (),
+        ('Delta', 2022): (9, 9),
+    }
+    for (name, year), marks in scores.items():
+        title = Title.objects.create(name=name, year=year)
+        for author, score in zip(authors, marks):
+            Review.objects.create(title=title, author=author, text='text',
+                                  score=score)
+
+
+def names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    @pytest.mark.parametrize('ordering, expected', (
+        ('-rating', ['Alpha', 'Delta', 'Beta', 'Gamma']),
+        ('rating', ['Gamma', 'Beta', 'Delta', 'Alpha']),
+        ('-year', ['Delta', 'Gamma', 'Beta', 'Alpha']),
+        ('-reviews_count', ['Beta', 'Delta', 'Alpha', 'Gamma']),
+        ('name', ['Alpha', 'Beta', 'Delta', 'Gamma']),
+    ))
+    def test_ordering(self, titles, ordering, expected):
+        response = APIClient().get(f'/api/v1/titles/?ordering={ordering}')
+        assert names(response) == expected, (
+            f'Проверьте сортировку произведений по {ordering}'
+        )
+
+    def test_year_range_with_rating(self, titles):
+        response = APIClient().get(
+            '/api/v1/titles/?year_min=2020&year_max=2029&ordering=-rating'
+        )
+        assert names(response) == ['Delta', 'Beta', 'Gamma'], (
+            'Проверьте фильтры year_min и year_max'
+        )
+
+    def test_unknown_ordering_is_ignored(self, titles):
+        response = APIClient().get('/api/v1/titles/?ordering=description')
+        assert names(response) == ['Alpha', 'Beta', 'Delta', 'Gamma']
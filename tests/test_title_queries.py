@@ -0,0 +1,63 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Review, Title
+from user.models import User
+
+TITLE_LIST_QUERIES = 3
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    author = User.objects.create(username='author', email='author@ya.ru')
+    result = []
+    for i in range(20):
+        title = Title.objects.create(name=f'Title {i:02}', year=2000,
+                                     category=category)
+        title.genre.set(genres)
+        Review.objects.create(title=title, author=author, text='text',
+                              score=i % 10 + 1)
+        result.append(title)
+    return result
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('page_size', (5, 20))
+    def test_title_list_query_count(self, titles, page_size, monkeypatch,
+                                    django_assert_num_queries):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        client = APIClient()
+        with django_assert_num_queries(TITLE_LIST_QUERIES):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(len(title['genre']) == 3 for title in results), (
+            'Проверьте, что жанры произведений загружаются в списке'
+        )
+        assert results[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert results[0]['rating'] == 1.0, (
+            'Проверьте, что рейтинг произведения вычисляется в запросе'
+        )
+
+    def test_title_detail_query_count(self, titles,
+                                      django_assert_num_queries):
+        client = APIClient()
+        # валидатор ETag, произведение с категорией и жанры
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{titles[3].id}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 4.0
+
+    def test_title_without_reviews_has_no_rating(self):
+        title = Title.objects.create(name='Empty', year=2000)
+        response = APIClient().get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] is None
@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+from user.models import User
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def setup_method(self):
+        self.title = Title.objects.create(name='Title', year=2000)
+        self.authors = [
+            User.objects.create(username=f'user{i}', email=f'user{i}@ya.ru')
+            for i in range(3)
+        ]
+
+    def test_rating_follows_reviews(self):
+        first = Review.objects.create(
+            title=self.title, author=self.authors[0], text='a', score=4
+        )
+        Review.objects.create(
+            title=self.title, author=self.authors[1], text='b', score=10
+        )
+        self.title.refresh_from_db()
+        assert (self.title.rating_sum, self.title.rating_count) == (14, 2), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения'
+        )
+
+        first = Review.objects.get(pk=first.pk)
+        first.score = 6
+        first.save()
+        self.title.refresh_from_db()
+        assert (self.title.rating_sum, self.title.rating_count) == (16, 2), (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения'
+        )
+
+        first.delete()
+        self.title.refresh_from_db()
+        assert (self.title.rating_sum, self.title.rating_count) == (10, 1), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения'
+        )
+
+    def test_rating_after_cascade_delete(self):
+        Review.objects.create(
+            title=self.title, author=self.authors[0], text='a', score=4
+        )
+        self.authors[0].delete()
+        self.title.refresh_from_db()
+        assert (self.title.rating_sum, self.title.rating_count) == (0, 0), (
+            'Проверьте, что каскадное удаление отзывов обновляет рейтинг'
+        )
+
+    def test_ratings_command(self):
+        Review.objects.create(
+            title=self.title, author=self.authors[0], text='a', score=4
+        )
+        Title.objects.update(rating_sum=0, rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('ratings', '--check')
+        call_command('ratings')
+        call_command('ratings', '--check')
+        self.title.refresh_from_db()
+        assert (self.title.rating_sum, self.title.rating_count) == (4, 1), (
+            'Проверьте, что команда ratings пересчитывает рейтинг'
+        )
@@ -0,0 +1,20 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_by_name_and_description(self):
+        Title.objects.create(name='Звёздные войны', year=1977)
+        Title.objects.create(name='Солярис', year=1972,
+                             description='Фантастика про войны миров')
+        Title.objects.create(name='Сталкер', year=1979)
+        response = APIClient().get('/api/v1/titles/?search=войны')
+        assert response.status_code == 200
+        names = {title['name'] for title in response.json()['results']}
+        assert names == {'Звёздные войны', 'Солярис'}, (
+            'Проверьте, что параметр search ищет по названию и описанию'
+        )